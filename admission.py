@@ -0,0 +1,285 @@
+"""메모리 기반 동시 분석 수용 제어.
+
+업로드 이미지를 디코딩하기 전에 헤더(크기/모드)만 읽어서 처리 중 최대 메모리를
+추정하고, 설정한 예산(MEMORY_BUDGET_MB)을 넘는 작업은 대기시키거나 거절한다.
+"""
+
+import asyncio
+import io
+import math
+import os
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from PIL import Image
+
+from analyzer import (
+    MAX_DIMENSION,
+    MAX_TILE_BYTES,
+    TARGET_WIDTH,
+    TILE_HEIGHT,
+    TILE_OVERLAP,
+)
+
+MEMORY_BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "256"))
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", "60"))  # seconds
+
+_BYTES_PER_PIXEL = {
+    "1": 1,
+    "L": 1,
+    "P": 1,
+    "LA": 2,
+    "I;16": 2,
+    "RGB": 3,
+    "YCbCr": 3,
+    "LAB": 3,
+    "HSV": 3,
+    "RGBA": 4,
+    "CMYK": 4,
+    "I": 4,
+    "F": 4,
+}
+
+
+class AdmissionRejected(Exception):
+    """단일 요청이 메모리 예산 자체를 초과함."""
+
+
+class AdmissionTimeout(Exception):
+    """대기 시간 안에 메모리를 확보하지 못함."""
+
+
+def estimate_image_bytes(image_bytes: bytes) -> int:
+    """이미지 1장을 _process_single_image로 처리할 때의 최대 메모리 추정.
+
+    원본 디코딩 + (P 모드면 RGBA 변환본) + 리사이즈본 + JPEG 저장용 RGB 변환본
+    (RGBA일 때만)을 동시에 들고 있는 시점을 최대치로 본다. MAX_DIMENSION보다 긴
+    이미지만 타일로 자르므로 그때만 타일 1장을 더한다. 헤더만 읽으므로 디코딩하지
+    않는다.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        width, height = img.size
+        mode = img.mode
+
+    bpp = _BYTES_PER_PIXEL.get(mode, 4)
+    peak = width * height * bpp
+    if mode == "P":
+        mode = "RGBA"
+        bpp = 4
+        peak += width * height * bpp
+
+    if width > TARGET_WIDTH:
+        height = int(height * TARGET_WIDTH / width)
+        width = TARGET_WIDTH
+        peak += width * height * bpp
+
+    # _save_jpeg는 RGBA만 RGB로 변환한다
+    rgb_bpp = 3 if mode == "RGBA" else 0
+    if height <= MAX_DIMENSION:
+        peak += width * height * rgb_bpp
+    else:
+        peak += width * min(height, TILE_HEIGHT) * (bpp + rgb_bpp)
+    return peak
+
+
+def estimate_payload_bytes(image_bytes: bytes) -> int:
+    """처리 후 API 요청이 끝날 때까지 유지되는 base64 타일 크기 추정."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        width, height = img.size
+    if width > TARGET_WIDTH:
+        height = int(height * TARGET_WIDTH / width)
+    if height <= MAX_DIMENSION:
+        tiles = 1
+    else:
+        tiles = math.ceil((height - TILE_OVERLAP) / (TILE_HEIGHT - TILE_OVERLAP))
+    return tiles * MAX_TILE_BYTES * 4 // 3
+
+
+def estimate_request_bytes(image_bytes_list: list[tuple[bytes, str]]) -> tuple[int, int]:
+    """요청의 (이미지 처리 중 최대 메모리, 처리 후 유지되는 payload) 추정.
+
+    이미지는 순차 처리되므로 처리 중 최대치는 가장 큰 1장 + 누적 payload다.
+    처리가 끝나면 모델 응답을 기다리는 동안 payload만 남는다.
+    타일 캐시에 있는 이미지도 예약한다. 예약 후 처리 전에 캐시에서 밀려나면
+    디코딩하게 되므로 캐시 여부로 예약을 줄이지 않는다.
+    """
+    peak = 0
+    payload = 0
+    for image_bytes, _media_type in image_bytes_list:
+        peak = max(peak, estimate_image_bytes(image_bytes))
+        payload += estimate_payload_bytes(image_bytes)
+    return peak + payload, payload
+
+
+class _Ticket:
+    """대기열 항목. 허가되면 granted=True 후 wake()로 대기자를 깨운다."""
+
+    __slots__ = ("nbytes", "wake", "granted")
+
+    def __init__(self, nbytes: int, wake):
+        self.nbytes = nbytes
+        self.wake = wake
+        self.granted = False
+
+
+class Reservation:
+    """reserve()/reserve_async()가 돌려주는 예약. shrink()로 일부를 먼저 반납한다."""
+
+    def __init__(self, controller: "AdmissionController", nbytes: int):
+        self._controller = controller
+        self.nbytes = nbytes
+
+    def shrink(self, nbytes: int):
+        """예약을 nbytes로 줄이고 차액을 반납 (예: 이미지 처리 후 payload만 유지)."""
+        if nbytes < self.nbytes:
+            self._controller._release_bytes(self.nbytes - nbytes)
+            self.nbytes = nbytes
+
+
+class AdmissionController:
+    """예약된 메모리 합계가 budget_bytes를 넘지 않도록 작업을 수용.
+
+    대기 중인 작업은 도착 순서(FIFO)대로 허가한다. 맨 앞 작업이 들어갈 자리가
+    날 때까지 뒤의 작은 작업도 기다리므로 큰 업로드가 계속 밀리지 않는다.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._reserved = 0
+        self._active = 0
+        self._queue = deque()  # [_Ticket]
+        self._lock = threading.Lock()
+
+    @property
+    def reserved_bytes(self) -> int:
+        return self._reserved
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "reserved_bytes": self._reserved,
+                "active": self._active,
+                "waiting": len(self._queue),
+            }
+
+    def _check(self, nbytes: int):
+        if nbytes > self.budget_bytes:
+            raise AdmissionRejected(
+                f"예상 메모리 {nbytes // (1024 * 1024)}MB가 "
+                f"예산 {self.budget_bytes // (1024 * 1024)}MB를 초과합니다."
+            )
+
+    def _fits(self, nbytes: int) -> bool:
+        return self._reserved + nbytes <= self.budget_bytes
+
+    def _take(self, nbytes: int):
+        self._reserved += nbytes
+        self._active += 1
+
+    def _grant_waiters(self):
+        """대기열 맨 앞부터 들어갈 수 있는 만큼 허가. _lock을 잡은 상태에서 호출."""
+        while self._queue and self._fits(self._queue[0].nbytes):
+            ticket = self._queue.popleft()
+            self._take(ticket.nbytes)
+            ticket.granted = True
+            ticket.wake()
+
+    def _enqueue(self, nbytes: int, wake):
+        """바로 들어갈 수 있으면 None, 아니면 대기열에 넣은 _Ticket 반환."""
+        self._check(nbytes)
+        with self._lock:
+            if not self._queue and self._fits(nbytes):
+                self._take(nbytes)
+                return None
+            ticket = _Ticket(nbytes, wake)
+            self._queue.append(ticket)
+            return ticket
+
+    def _abandon(self, ticket: _Ticket) -> bool:
+        """대기 포기. 이미 허가된 경우 True (호출자가 release 해야 함)."""
+        with self._lock:
+            if ticket.granted:
+                return True
+            self._queue.remove(ticket)
+            # 맨 앞이 빠지면 뒤의 작업이 들어갈 수 있다
+            self._grant_waiters()
+            return False
+
+    def try_acquire(self, nbytes: int) -> bool:
+        """대기 없이 즉시 들어갈 수 있을 때만 예약 (대기열이 비어 있어야 함)."""
+        self._check(nbytes)
+        with self._lock:
+            if self._queue or not self._fits(nbytes):
+                return False
+            self._take(nbytes)
+            return True
+
+    def acquire(self, nbytes: int, timeout: float = ADMISSION_TIMEOUT):
+        event = threading.Event()
+        ticket = self._enqueue(nbytes, event.set)
+        if ticket is None:
+            return
+        event.wait(timeout)
+        if not self._abandon(ticket):
+            raise AdmissionTimeout("서버가 혼잡합니다. 잠시 후 다시 시도해주세요.")
+
+    async def acquire_async(self, nbytes: int, timeout: float = ADMISSION_TIMEOUT):
+        """이벤트 루프를 막지 않고 대기. 허가는 다른 스레드에서 올 수 있다."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(None)
+            )
+
+        ticket = self._enqueue(nbytes, wake)
+        if ticket is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(ticket):
+                raise AdmissionTimeout(
+                    "서버가 혼잡합니다. 잠시 후 다시 시도해주세요."
+                ) from None
+        except BaseException:
+            # 요청 취소 등: 이미 허가됐으면 반납
+            if self._abandon(ticket):
+                self.release(nbytes)
+            raise
+
+    def release(self, nbytes: int):
+        with self._lock:
+            self._reserved -= nbytes
+            self._active -= 1
+            self._grant_waiters()
+
+    def _release_bytes(self, nbytes: int):
+        """작업은 계속 진행하면서 예약 일부만 반납."""
+        with self._lock:
+            self._reserved -= nbytes
+            self._grant_waiters()
+
+    @contextmanager
+    def reserve(self, nbytes: int, timeout: float = ADMISSION_TIMEOUT):
+        self.acquire(nbytes, timeout)
+        reservation = Reservation(self, nbytes)
+        try:
+            yield reservation
+        finally:
+            self.release(reservation.nbytes)
+
+    @asynccontextmanager
+    async def reserve_async(self, nbytes: int, timeout: float = ADMISSION_TIMEOUT):
+        await self.acquire_async(nbytes, timeout)
+        reservation = Reservation(self, nbytes)
+        try:
+            yield reservation
+        finally:
+            self.release(reservation.nbytes)
+
+
+controller = AdmissionController(MEMORY_BUDGET_MB * 1024 * 1024)
@@ -1,15 +1,28 @@
+import asyncio
 import base64
-import gc
 import io
 import json
 import logging
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import anthropic
 from PIL import Image
 
-from prompt import SYSTEM_PROMPT, USER_PROMPT
+import image_store
+from prompt import (
+    ANALYSIS_FIELDS,
+    DEEP_PARTS,
+    DEEP_STRUCTURE_PROMPT,
+    QUICK_PROMPT,
+    SPLIT_PARTS,
+    SPLIT_SYSTEM_PROMPT,
+    STRUCTURE_PROMPT,
+    SYSTEM_PROMPT,
+    USER_PROMPT,
+    with_context,
+)
 
 MAX_TILE_BYTES = 1_500_000
 MAX_DIMENSION = 7900
@@ -17,6 +30,17 @@ TILE_HEIGHT = 4000
 TILE_OVERLAP = 300
 TARGET_WIDTH = 1400
 
+MODEL = "claude-sonnet-4-5-20250929"
+MAX_TOKENS = 32000
+# 분할 모드 파트별 출력 토큰 상한
+SPLIT_MAX_TOKENS = {
+    "structure": 16000,
+    "scoring": 8000,
+    "framework": 8000,
+    "recommendations": 16000,
+}
+QUICK_MAX_TOKENS = 2000
+
 MAX_RETRIES = 2
 RETRY_DELAY = 3  # seconds
 
@@ -45,7 +69,7 @@ def _save_jpeg(img: Image.Image, max_bytes: int = MAX_TILE_BYTES) -> bytes:
 
 
 def _process_single_image(image_bytes: bytes) -> list[dict]:
-    """이미지 1장 처리 → API content 블록 리스트. 메모리 즉시 해제."""
+    """이미지 1장 처리 → API content 블록 리스트."""
     img = Image.open(io.BytesIO(image_bytes))
     if img.mode == "P":
         img = img.convert("RGBA")
@@ -85,20 +109,21 @@ def _process_single_image(image_bytes: bytes) -> list[dict]:
                 break
         img.close()
 
-    gc.collect()
     return content_blocks
 
 
-def _call_api_with_retry(client, content: list) -> str:
+def _call_api_with_retry(
+    client, content: list, system: str = SYSTEM_PROMPT, max_tokens: int = MAX_TOKENS
+) -> str:
     """API 호출 + 서버 에러 시 최대 MAX_RETRIES회 재시도."""
     last_error = None
     for attempt in range(1 + MAX_RETRIES):
         try:
             result_text = ""
             with client.messages.stream(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=32000,
-                system=SYSTEM_PROMPT,
+                model=MODEL,
+                max_tokens=max_tokens,
+                system=system,
                 messages=[{"role": "user", "content": content}],
             ) as stream:
                 for text in stream.text_stream:
@@ -126,27 +151,293 @@ def _call_api_with_retry(client, content: list) -> str:
     raise last_error
 
 
-def analyze_page(image_bytes_list: list[tuple[bytes, str]], api_key: str) -> dict:
-    """상세페이지 이미지를 1회 호출로 분석."""
-    client = anthropic.Anthropic(api_key=api_key)
+async def _call_api_with_retry_async(
+    client, content: list, system: str = SYSTEM_PROMPT, max_tokens: int = MAX_TOKENS
+) -> str:
+    """_call_api_with_retry의 비동기 버전 (AsyncAnthropic 클라이언트용)."""
+    last_error = None
+    for attempt in range(1 + MAX_RETRIES):
+        try:
+            chunks = []
+            async with client.messages.stream(
+                model=MODEL,
+                max_tokens=max_tokens,
+                system=system,
+                messages=[{"role": "user", "content": content}],
+            ) as stream:
+                async for text in stream.text_stream:
+                    chunks.append(text)
+            return "".join(chunks)
+        except anthropic.APIStatusError as e:
+            last_error = e
+            if e.status_code >= 500 and attempt < MAX_RETRIES:
+                logger.warning(
+                    f"API 서버 에러 (HTTP {e.status_code}), "
+                    f"{RETRY_DELAY}초 후 재시도 ({attempt + 1}/{MAX_RETRIES})"
+                )
+                await asyncio.sleep(RETRY_DELAY)
+            else:
+                raise
+        except anthropic.APIConnectionError as e:
+            last_error = e
+            if attempt < MAX_RETRIES:
+                logger.warning(
+                    f"API 연결 에러, {RETRY_DELAY}초 후 재시도 ({attempt + 1}/{MAX_RETRIES})"
+                )
+                await asyncio.sleep(RETRY_DELAY)
+            else:
+                raise
+    raise last_error
+
 
+def build_image_blocks(image_bytes_list: list[tuple[bytes, str]]) -> list:
+    """이미지 리스트 → API 이미지 content 블록. 처리한 원본은 즉시 비움.
+
+    같은 내용의 이미지는 image_store 타일 캐시에서 재사용한다.
+    """
     content = []
     for i, (image_bytes, _media_type) in enumerate(image_bytes_list):
-        blocks = _process_single_image(image_bytes)
+        cid = image_store.content_id(image_bytes)
+        blocks = image_store.get_tiles(cid)
+        if blocks is None:
+            blocks = _process_single_image(image_bytes)
+            image_store.put_tiles(cid, blocks)
         content.extend(blocks)
         del blocks
         image_bytes_list[i] = (b"", "")
-        gc.collect()
+    return content
+
 
+def build_content(image_bytes_list: list[tuple[bytes, str]]) -> list:
+    """이미지 리스트 → API content 블록 (이미지 타일 + 사용자 프롬프트)."""
+    content = build_image_blocks(image_bytes_list)
     content.append({"type": "text", "text": USER_PROMPT})
+    return content
+
+
+def _images_ready(callback):
+    if callback is not None:
+        callback()
+
+
+def _cache_image_prefix(image_blocks: list):
+    """마지막 이미지 블록에 cache_control 지정 → 파트 간 system+이미지 재사용."""
+    if image_blocks:
+        image_blocks[-1] = {**image_blocks[-1], "cache_control": {"type": "ephemeral"}}
+
+
+def _with_text(image_blocks: list, text: str) -> list:
+    return image_blocks + [{"type": "text", "text": text}]
+
+
+def merge_results(*results: dict) -> dict:
+    """부분 결과들을 단일 호출 모드와 같은 JSON 형태(필드 순서)로 병합."""
+    merged = {}
+    for result in results:
+        merged.update(result)
+    ordered = {k: merged.pop(k) for k in ANALYSIS_FIELDS if k in merged}
+    ordered.update(merged)
+    return ordered
+
+
+def analyze_page(
+    image_bytes_list: list[tuple[bytes, str]], api_key: str, on_images_ready=None
+) -> dict:
+    """상세페이지 이미지를 1회 호출로 분석.
+
+    on_images_ready: 이미지 처리가 끝나고 모델을 호출하기 직전에 부르는 콜백
+    (디코딩용 메모리 예약을 반납하는 데 쓴다). 다른 analyze_page_* 도 같다.
+    """
+    client = anthropic.Anthropic(api_key=api_key)
+
+    content = build_content(image_bytes_list)
+    _images_ready(on_images_ready)
 
     raw_text = _call_api_with_retry(client, content)
     del content
-    gc.collect()
 
     return _extract_json(raw_text)
 
 
+async def analyze_page_async(
+    image_bytes_list: list[tuple[bytes, str]],
+    client: anthropic.AsyncAnthropic,
+    executor=None,
+    on_images_ready=None,
+) -> dict:
+    """analyze_page의 비동기 버전. Pillow 처리는 executor에서 실행."""
+    loop = asyncio.get_running_loop()
+    content = await loop.run_in_executor(executor, build_content, image_bytes_list)
+    _images_ready(on_images_ready)
+
+    raw_text = await _call_api_with_retry_async(client, content)
+    del content
+
+    return _extract_json(raw_text)
+
+
+def analyze_page_split(
+    image_bytes_list: list[tuple[bytes, str]], api_key: str, on_images_ready=None
+) -> dict:
+    """스키마를 나눠 분석: OCR+섹션 → (점수/프레임워크, 추천) 병렬 호출 후 병합."""
+    client = anthropic.Anthropic(api_key=api_key)
+
+    image_blocks = build_image_blocks(image_bytes_list)
+    _images_ready(on_images_ready)
+    _cache_image_prefix(image_blocks)
+
+    structure = _extract_json(
+        _call_api_with_retry(
+            client,
+            _with_text(image_blocks, STRUCTURE_PROMPT),
+            SPLIT_SYSTEM_PROMPT,
+            SPLIT_MAX_TOKENS["structure"],
+        )
+    )
+    parts = _run_parts(client, image_blocks, SPLIT_PARTS, _context_json(structure))
+    del image_blocks
+
+    return merge_results(structure, *parts)
+
+
+def _context_json(*results: dict) -> str:
+    """다음 단계에 넘길 컨텍스트. 분석 스키마 필드만 남긴다 (analysis_stage 등 제외)."""
+    merged = merge_results(*results)
+    return json.dumps(
+        {k: v for k, v in merged.items() if k in ANALYSIS_FIELDS}, ensure_ascii=False
+    )
+
+
+def _run_parts(
+    client,
+    image_blocks: list,
+    parts: dict,
+    context_json: str,
+    label: str = "OCR/섹션 분석 결과",
+) -> list:
+    """parts의 각 지시문을 같은 이미지/컨텍스트로 병렬 호출. 결과는 parts 순서."""
+
+    def run_part(name: str) -> dict:
+        raw_text = _call_api_with_retry(
+            client,
+            _with_text(image_blocks, with_context(parts[name], context_json, label)),
+            SPLIT_SYSTEM_PROMPT,
+            SPLIT_MAX_TOKENS[name],
+        )
+        return _extract_json(raw_text)
+
+    with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+        return list(pool.map(run_part, parts))
+
+
+async def _run_parts_async(
+    client,
+    image_blocks: list,
+    parts: dict,
+    context_json: str,
+    label: str = "OCR/섹션 분석 결과",
+) -> list:
+    """_run_parts의 비동기 버전."""
+
+    async def run_part(name: str) -> dict:
+        raw_text = await _call_api_with_retry_async(
+            client,
+            _with_text(image_blocks, with_context(parts[name], context_json, label)),
+            SPLIT_SYSTEM_PROMPT,
+            SPLIT_MAX_TOKENS[name],
+        )
+        return _extract_json(raw_text)
+
+    return list(await asyncio.gather(*(run_part(name) for name in parts)))
+
+
+def analyze_page_quick(
+    image_bytes_list: list[tuple[bytes, str]], api_key: str, on_images_ready=None
+) -> dict:
+    """빠른 스캔: 상품 정보 + 6개 점수만. 처리된 타일은 심층 분석이 캐시로 재사용."""
+    client = anthropic.Anthropic(api_key=api_key)
+
+    image_blocks = build_image_blocks(image_bytes_list)
+    _images_ready(on_images_ready)
+    _cache_image_prefix(image_blocks)
+
+    raw_text = _call_api_with_retry(
+        client,
+        _with_text(image_blocks, QUICK_PROMPT),
+        SPLIT_SYSTEM_PROMPT,
+        QUICK_MAX_TOKENS,
+    )
+    return merge_results(_extract_json(raw_text))
+
+
+def analyze_page_deep(
+    image_bytes_list: list[tuple[bytes, str]],
+    quick_result: dict,
+    api_key: str,
+    on_images_ready=None,
+) -> dict:
+    """심층 분석: 빠른 스캔 결과를 근거로 섹션 → (프레임워크, 추천) 병렬 호출 후 병합."""
+    client = anthropic.Anthropic(api_key=api_key)
+
+    image_blocks = build_image_blocks(image_bytes_list)
+    _images_ready(on_images_ready)
+    _cache_image_prefix(image_blocks)
+
+    structure = _extract_json(
+        _call_api_with_retry(
+            client,
+            _with_text(
+                image_blocks,
+                with_context(
+                    DEEP_STRUCTURE_PROMPT, _context_json(quick_result), "빠른 스캔 결과"
+                ),
+            ),
+            SPLIT_SYSTEM_PROMPT,
+            SPLIT_MAX_TOKENS["structure"],
+        )
+    )
+    parts = _run_parts(
+        client,
+        image_blocks,
+        DEEP_PARTS,
+        _context_json(quick_result, structure),
+        "빠른 스캔 + 섹션 분석 결과",
+    )
+
+    # 점수는 빠른 스캔 결과를 유지
+    return merge_results(structure, *parts, quick_result)
+
+
+async def analyze_page_split_async(
+    image_bytes_list: list[tuple[bytes, str]],
+    client: anthropic.AsyncAnthropic,
+    executor=None,
+    on_images_ready=None,
+) -> dict:
+    """analyze_page_split의 비동기 버전."""
+    loop = asyncio.get_running_loop()
+    image_blocks = await loop.run_in_executor(
+        executor, build_image_blocks, image_bytes_list
+    )
+    _images_ready(on_images_ready)
+    _cache_image_prefix(image_blocks)
+
+    structure = _extract_json(
+        await _call_api_with_retry_async(
+            client,
+            _with_text(image_blocks, STRUCTURE_PROMPT),
+            SPLIT_SYSTEM_PROMPT,
+            SPLIT_MAX_TOKENS["structure"],
+        )
+    )
+    parts = await _run_parts_async(
+        client, image_blocks, SPLIT_PARTS, _context_json(structure)
+    )
+    del image_blocks
+
+    return merge_results(structure, *parts)
+
+
 def _extract_json(raw_text: str) -> dict:
     match = re.search(r"```json\s*(.*?)\s*```", raw_text, re.DOTALL)
     if match:
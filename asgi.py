@@ -0,0 +1,226 @@
+"""ASGI 엔트리포인트 - 분석/Figma 내보내기를 비동기로 처리.
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+/analyze, /export-figma는 AsyncAnthropic / httpx 비동기 클라이언트로 처리하므로
+모델 스트리밍 동안 스레드를 점유하지 않는다. Pillow 작업은 전용 스레드 풀에서
+실행한다. 나머지 라우트(/, /generate-draft, /temp-image, /admin ...)는 기존
+Flask 앱을 그대로 마운트해서 서빙한다.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+import server
+
+# anthropic, httpx, PIL(admission/analyzer)은 server와 마찬가지로 처음 필요할 때
+# import 한다 (콜드 스타트 시 첫 응답을 빨리 보내기 위해).
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+WSGI_WORKERS = int(os.getenv("WSGI_WORKERS", "10"))
+
+_image_executor = ThreadPoolExecutor(
+    max_workers=IMAGE_WORKERS, thread_name_prefix="pillow"
+)
+_anthropic_client = None
+_http_client = None
+
+
+def _get_anthropic(api_key: str):
+    """커넥션 풀을 재사용하도록 AsyncAnthropic 클라이언트를 1개만 생성."""
+    global _anthropic_client
+    if _anthropic_client is None or _anthropic_client.api_key != api_key:
+        import anthropic
+
+        _anthropic_client = anthropic.AsyncAnthropic(api_key=api_key)
+    return _anthropic_client
+
+
+def _get_http():
+    """httpx.AsyncClient 1개를 재사용."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        _http_client = httpx.AsyncClient(timeout=120)
+    return _http_client
+
+
+def _too_large(request) -> bool:
+    length = request.headers.get("content-length")
+    return (
+        length is not None
+        and length.isdigit()
+        and int(length) > server.app.config["MAX_CONTENT_LENGTH"]
+    )
+
+
+def _error(message: str, status: int) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def _missing_images(e: LookupError) -> JSONResponse:
+    return JSONResponse(
+        {
+            "error": "이미지를 찾을 수 없습니다. 다시 업로드해주세요.",
+            "missing_image_ids": e.args[0],
+        },
+        status_code=404,
+    )
+
+
+async def _images_from_form(form) -> list[tuple[bytes, str]]:
+    """server.images_from_request의 ASGI 버전."""
+    ids = form.getlist("image_ids")
+    if ids:
+        return server.resolve_image_ids(ids)
+    return [
+        (await f.read(), server.media_type_for(f.filename))
+        for f in form.getlist("images")
+    ]
+
+
+def _save_submission(result: dict, image_count: int):
+    with server.app.app_context():
+        server.save_submission(result, image_count)
+
+
+async def analyze(request):
+    api_key = os.getenv("ANTHROPIC_API_KEY", "")
+    if not api_key:
+        return _error("서버에 API 키가 설정되지 않았습니다.", 500)
+    if _too_large(request):
+        return _error("파일이 너무 큽니다. 30MB 이하로 업로드해주세요.", 413)
+
+    form = await request.form()
+    try:
+        image_list = await _images_from_form(form)
+    except LookupError as e:
+        return _missing_images(e)
+    if not image_list:
+        return _error("이미지를 업로드해주세요.", 400)
+    image_count = len(image_list)
+
+    from admission import (
+        AdmissionRejected,
+        AdmissionTimeout,
+        controller,
+        estimate_request_bytes,
+    )
+    from analyzer import analyze_page_async, analyze_page_split_async
+
+    mode = form.get("mode") or os.getenv("ANALYSIS_MODE", "single")
+    analyze_fn = analyze_page_split_async if mode == "split" else analyze_page_async
+    await form.close()
+
+    try:
+        # 헤더 파싱도 이벤트 루프 밖에서
+        needed, payload = await asyncio.get_running_loop().run_in_executor(
+            _image_executor, estimate_request_bytes, image_list
+        )
+    except Exception as e:
+        server.app.logger.warning(f"이미지 헤더 읽기 실패: {e}")
+        return _error("이미지를 읽을 수 없습니다.", 400)
+
+    try:
+        # 이미지 처리 후에는 스트리밍 동안 payload만 예약해 둔다
+        async with controller.reserve_async(needed) as reservation:
+            result = await analyze_fn(
+                image_list,
+                _get_anthropic(api_key),
+                executor=_image_executor,
+                on_images_ready=lambda: reservation.shrink(payload),
+            )
+            del image_list  # free memory
+
+        await run_in_threadpool(_save_submission, result, image_count)
+
+        return JSONResponse(result)
+    except AdmissionRejected as e:
+        return _error(str(e), 413)
+    except AdmissionTimeout as e:
+        return _error(str(e), 503)
+    except Exception as e:
+        server.app.logger.error(f"분석 오류: {e}")
+        return _error(str(e), 500)
+
+
+async def _codia_convert(codia_key: str, image_url: str) -> dict:
+    import httpx
+
+    try:
+        resp = await _get_http().post(
+            server.CODIA_URL,
+            headers={
+                "Authorization": f"Bearer {codia_key}",
+                "Content-Type": "application/json",
+            },
+            json={"image_url": image_url},
+        )
+        resp.raise_for_status()
+        return {"status": "ok", "data": resp.json()}
+    except httpx.HTTPError as e:
+        return {"status": "error", "error": str(e)}
+
+
+async def export_figma(request):
+    codia_key = os.getenv("CODIA_API_KEY", "")
+    if not codia_key:
+        return _error("CODIA_API_KEY가 설정되지 않았습니다.", 500)
+    if _too_large(request):
+        return _error("파일이 너무 큽니다. 30MB 이하로 업로드해주세요.", 413)
+
+    form = await request.form()
+    try:
+        image_list = await _images_from_form(form)
+    except LookupError as e:
+        return _missing_images(e)
+    await form.close()
+    if not image_list:
+        return _error("이미지를 업로드해주세요.", 400)
+
+    server._cleanup_temp_images()
+
+    # /temp-image 는 마운트된 Flask 앱이 같은 _temp_images 에서 서빙한다.
+    image_urls = [
+        f"{request.base_url}temp-image/{server.add_temp_image(data, media_type)}"
+        for data, media_type in image_list
+    ]
+    del image_list
+
+    results = await asyncio.gather(
+        *(_codia_convert(codia_key, url) for url in image_urls)
+    )
+
+    server._cleanup_temp_images()
+    return JSONResponse({"results": list(results)})
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    # import 시점이 아니라 서버 시작 단계에서 워밍업을 띄운다 (server.start_warmup 참고)
+    server.start_warmup()
+    yield
+    if _http_client is not None:
+        await _http_client.aclose()
+    if _anthropic_client is not None:
+        await _anthropic_client.close()
+    _image_executor.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route("/analyze", analyze, methods=["POST"]),
+        Route("/export-figma", export_figma, methods=["POST"]),
+        Mount("/", app=WSGIMiddleware(server.app, workers=WSGI_WORKERS)),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,163 @@
+"""콜드 스타트 측정 - server/asgi 모듈 import 시간과 첫 응답(TTFB)까지 걸리는 시간.
+
+    python coldstart_report.py
+    python coldstart_report.py --runs 5 --path /admin
+    python coldstart_report.py --baseline 4938abf   # 지연 import 도입 전과 비교
+
+각 측정은 새 프로세스에서 실행한다. WARMUP=0/1 두 가지 설정으로 비교하고,
+`python -X importtime` 결과 중 누적 시간이 큰 모듈 상위 N개를 출력한다.
+--baseline 을 주면 해당 git 리비전을 임시 디렉터리에 풀어서 같은 항목을 함께 잰다.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _env(warmup: str, cwd: str) -> dict:
+    env = dict(os.environ)
+    env["WARMUP"] = warmup
+    # 비교 대상마다 새 SQLite 파일을 쓰도록 (기존 DB 상태가 측정에 섞이지 않게)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(cwd, 'coldstart.db')}")
+    return env
+
+
+def measure_import(module: str, warmup: str, cwd: str = HERE) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        cwd=cwd,
+        env=_env(warmup, cwd),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def top_imports(limit: int, module: str = "server") -> list[tuple[int, str]]:
+    """-X importtime 출력에서 누적(cumulative) 시간 상위 모듈."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE,
+        env=_env("0", HERE),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+@contextmanager
+def checkout(rev: str):
+    """git 리비전 rev의 트리를 임시 디렉터리에 풀어서 경로를 돌려준다."""
+    with tempfile.TemporaryDirectory(prefix="coldstart-") as tmp:
+        archive = subprocess.run(
+            ["git", "archive", rev], cwd=HERE, capture_output=True, check=True
+        )
+        subprocess.run(["tar", "-x", "-C", tmp], input=archive.stdout, check=True)
+        yield tmp
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_ttfb(warmup: str, path: str, cwd: str = HERE, timeout: float = 60.0) -> float:
+    """gunicorn 프로세스 시작 → path 첫 바이트 수신까지의 시간."""
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "server:app",
+            "--bind", f"127.0.0.1:{port}", "--workers", "1", "--threads", "2",
+        ],
+        cwd=cwd,
+        env=_env(warmup, cwd),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}") as resp:
+                    resp.read(1)
+                return time.perf_counter() - start
+            except urllib.error.HTTPError:
+                # 401/403 등도 응답을 받은 것이므로 TTFB로 간주
+                return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"{timeout}초 안에 응답 없음")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _median_ms(fn, runs: int) -> str:
+    return f"{statistics.median(fn() for _ in range(runs)) * 1000:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--baseline", help="비교할 git 리비전 (예: 지연 import 도입 전 커밋)")
+    args = parser.parse_args()
+
+    with (checkout(args.baseline) if args.baseline else _no_baseline()) as base:
+        # (이름, 디렉터리, WARMUP) - baseline 코드는 WARMUP을 읽지 않는다
+        targets = [(f"baseline {args.baseline}", base, "0")] if base else []
+        targets += [("WARMUP=0", HERE, "0"), ("WARMUP=1", HERE, "1")]
+
+        for module in ("server", "asgi"):
+            print(f"## import {module} ({args.runs}회 중앙값)")
+            for label, cwd, warmup in targets:
+                if not os.path.exists(os.path.join(cwd, f"{module}.py")):
+                    print(f"  {label:>20}: (없음)")
+                    continue
+                timing = _median_ms(lambda: measure_import(module, warmup, cwd), args.runs)
+                print(f"  {label:>20}: {timing}")
+            print()
+
+        print(f"## gunicorn 시작 → GET {args.path} 첫 바이트 ({args.runs}회 중앙값)")
+        for label, cwd, warmup in targets:
+            timing = _median_ms(lambda: measure_ttfb(warmup, args.path, cwd), args.runs)
+            print(f"  {label:>20}: {timing}")
+
+    print(f"\n## import 누적 시간 상위 {args.top}개 (WARMUP=0)")
+    for cumulative_us, name in top_imports(args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+@contextmanager
+def _no_baseline():
+    yield None
+
+
+if __name__ == "__main__":
+    main()
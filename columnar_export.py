@@ -0,0 +1,176 @@
+"""분석용 컬럼형 내보내기 - 제출 데이터를 평탄화해서 Parquet/Arrow/CSV로 스트리밍.
+
+중첩된 analysis_result 대신 점수, 등급, 섹션 역할/점수 등을 타입이 있는 컬럼으로
+펼친다. DB에서 ROW_GROUP_SIZE개씩 읽어 row group(또는 record batch) 단위로
+바로 내보내므로 전체 데이터를 메모리에 올리지 않는다. pyarrow가 없으면 CSV.
+"""
+
+import csv
+import io
+
+SCORE_KEYS = ("visual", "copy", "structure", "trust", "mobile", "conversion")
+ROW_GROUP_SIZE = 5000
+
+# (컬럼명, pyarrow 타입 이름) — pyarrow 없이도 CSV 헤더로 쓰기 위해 문자열로 둔다.
+COLUMNS = (
+    [
+        ("id", "int64"),
+        ("created_at", "timestamp"),
+        ("image_count", "int32"),
+        ("product_name", "string"),
+        ("brand_name", "string"),
+        ("category", "string"),
+        ("analysis_stage", "string"),
+        ("overall_score", "int32"),
+        ("grade", "string"),
+    ]
+    + [(f"score_{k}", "int32") for k in SCORE_KEYS]
+    + [
+        ("section_count", "int32"),
+        ("section_roles", "list<string>"),
+        ("section_scores", "list<int32>"),
+    ]
+)
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value))
+    if isinstance(value, str):
+        try:
+            return int(round(float(value)))
+        except ValueError:
+            return None
+    return None
+
+
+def _to_str(value):
+    return value if isinstance(value, str) else None
+
+
+def flatten_row(row: dict) -> dict:
+    """DB 행(컬럼 + scores/grade/sections/analysis_stage) → 평탄화된 dict."""
+    scores = row.get("scores") if isinstance(row.get("scores"), dict) else {}
+    sections = row.get("sections") if isinstance(row.get("sections"), list) else []
+    sections = [s for s in sections if isinstance(s, dict)]
+
+    flat = {
+        "id": row["id"],
+        "created_at": row.get("created_at"),
+        "image_count": _to_int(row.get("image_count")),
+        "product_name": row.get("product_name"),
+        "brand_name": row.get("brand_name"),
+        "category": row.get("category"),
+        "analysis_stage": _to_str(row.get("analysis_stage")),
+        "overall_score": _to_int(row.get("overall_score")),
+        "grade": _to_str(row.get("grade")),
+    }
+    for k in SCORE_KEYS:
+        flat[f"score_{k}"] = _to_int(scores.get(k))
+    flat["section_count"] = len(sections)
+    flat["section_roles"] = [_to_str(s.get("role")) for s in sections]
+    flat["section_scores"] = [_to_int(s.get("section_score")) for s in sections]
+    return flat
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    types = {
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "list<string>": pa.list_(pa.string()),
+        "list<int32>": pa.list_(pa.int32()),
+    }
+    return pa.schema([(name, types[t]) for name, t in COLUMNS])
+
+
+class _ChunkSink(io.RawIOBase):
+    """쓰기 누적 버퍼. tell()은 전체 기록 바이트 수를 유지하고 drain()으로 비운다."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._position += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _record_batch(rows: list[dict], schema):
+    import pyarrow as pa
+
+    flat = [flatten_row(r) for r in rows]
+    return pa.RecordBatch.from_pylist(flat, schema=schema)
+
+
+def iter_parquet(batches):
+    """row 배치 iterable → Parquet 바이트 청크 (배치 1개 = row group 1개)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd") as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_arrow(batches):
+    """row 배치 iterable → Arrow IPC stream 바이트 청크."""
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema) as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_csv(batches):
+    """row 배치 iterable → CSV 텍스트 청크. 리스트 컬럼은 '|'로 연결."""
+    names = [name for name, _type in COLUMNS]
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=names)
+    writer.writeheader()
+    for rows in batches:
+        for row in rows:
+            flat = flatten_row(row)
+            flat["section_roles"] = "|".join(r or "" for r in flat["section_roles"])
+            flat["section_scores"] = "|".join(
+                "" if s is None else str(s) for s in flat["section_scores"]
+            )
+            if flat["created_at"] is not None:
+                flat["created_at"] = flat["created_at"].isoformat()
+            writer.writerow(flat)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+def has_pyarrow() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
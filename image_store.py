@@ -0,0 +1,108 @@
+"""업로드 이미지 저장소 + 처리된 타일 캐시 (/analyze, /export-figma 공용).
+
+이미지는 내용 해시(content id)로 한 번만 저장하고, 분석용으로 처리한 타일
+content 블록(base64)도 같은 id로 캐시한다. 둘 다 바이트 상한을 넘으면 가장
+오래 쓰지 않은 항목부터 제거한다.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# 두 캐시는 admission 예산(MEMORY_BUDGET_MB) 밖에서 상주하므로, 인스턴스 메모리는
+# 프로세스 기본(약 100MB) + MEMORY_BUDGET_MB + IMAGE_STORE_MB + TILE_CACHE_MB 까지
+# 쓸 수 있다 (render.yaml 참고).
+IMAGE_STORE_MB = int(os.getenv("IMAGE_STORE_MB", "32"))
+TILE_CACHE_MB = int(os.getenv("TILE_CACHE_MB", "32"))
+
+
+class ByteLRU:
+    """항목 크기 합이 max_bytes를 넘지 않도록 LRU로 제거하는 dict."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # {key: (value, size)}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def put(self, key, value, size: int) -> bool:
+        """저장 후 True. size가 max_bytes보다 커서 저장할 수 없으면 False."""
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            if size > self.max_bytes:
+                return False
+            self._items[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _key, (_value, evicted) = self._items.popitem(last=False)
+                self._size -= evicted
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class ImageTooLarge(Exception):
+    """이미지 1장이 저장소 상한(IMAGE_STORE_MB)보다 큼."""
+
+
+_images = ByteLRU(IMAGE_STORE_MB * 1024 * 1024)  # {content_id: (bytes, media_type)}
+_tiles = ByteLRU(TILE_CACHE_MB * 1024 * 1024)  # {content_id: [content block, ...]}
+
+
+def content_id(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def put_image(data: bytes, media_type: str) -> str:
+    """이미지를 저장하고 content id 반환. 같은 내용은 한 번만 저장된다."""
+    cid = content_id(data)
+    if cid not in _images and not _images.put(cid, (data, media_type), len(data)):
+        raise ImageTooLarge(
+            f"이미지가 너무 큽니다 ({len(data) / (1024 * 1024):.1f}MB). "
+            f"{IMAGE_STORE_MB}MB 이하로 업로드해주세요."
+        )
+    return cid
+
+
+def get_image(cid: str):
+    """(bytes, media_type) 또는 None (만료/미존재)."""
+    return _images.get(cid)
+
+
+def get_tiles(cid: str):
+    return _tiles.get(cid)
+
+
+def put_tiles(cid: str, blocks: list) -> bool:
+    """타일 캐시에 저장. 캐시 상한보다 커서 저장하지 않았으면 False."""
+    size = sum(len(b["source"]["data"]) for b in blocks if b.get("type") == "image")
+    return _tiles.put(cid, blocks, size)
+
+
+def stats() -> dict:
+    return {"images": _images.stats(), "tiles": _tiles.stats()}
@@ -0,0 +1,466 @@
+"""부하 테스트 하네스 - 로컬 스텁 모델/Codia 서버로 서버 설정별 용량 측정.
+
+    # 스텁 + 설정별 서버를 직접 띄워서 측정 (WxT = gunicorn workers x threads)
+    python loadtest.py --configs 1x2 1x8 2x4 asgi -c 2 8 32
+
+    # 이미 떠 있는 서버 대상 (스텁은 직접 띄워서 환경변수로 연결)
+    python loadtest.py --url http://localhost:8000 -c 2 8 32
+
+/analyze, /generate-draft, /export-figma, /admin 요청과 ids(브라우저 UI처럼
+/images 업로드 후 image_ids로 /analyze) 흐름을 --mix 비율로 섞어
+동시성 단계별로 보내고, p50/p95/p99 지연시간, 처리량, 서버 프로세스 트리의
+최대 RSS, /admin/memory로 본 동시 분석/대기 수 최대값(act/wait)을 출력한다.
+이미지는 요청마다 바이트를 바꿔 보내므로 서버의 타일 캐시에 적중하지 않는다
+(--same-image 로 캐시 적중 상태 측정). 스텁 지연/토큰 속도/에러율은
+loadtest_stub.py 참고.
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests as req
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ADMIN_PASSWORD = "loadtest"
+DEFAULT_MIX = "analyze=2,ids=2,draft=3,figma=1,admin=2"
+
+SAMPLE_STRUCTURE = [
+    {
+        "order": i + 1,
+        "section_name": name,
+        "role": role,
+        "aidma_stage": stage,
+        "height_ratio": 1.0,
+        "key_elements": ["헤드카피", "제품 이미지"],
+        "suggested_copy": "추천 카피 문구",
+        "design_direction": "디자인 방향 가이드",
+        "color_mood": "따뜻한 톤",
+    }
+    for i, (name, role, stage) in enumerate([
+        ("히어로 배너", "감정공감", "Attention"),
+        ("문제 제기", "문제제기", "Interest"),
+        ("해결책", "해결제시", "Desire"),
+        ("후기", "증거", "Memory"),
+        ("구매 유도", "CTA", "Action"),
+    ])
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _make_image(width: int, height: int) -> bytes:
+    """Pillow 처리 비용이 실제와 비슷하도록 노이즈가 섞인 JPEG 생성."""
+    from PIL import Image
+
+    img = Image.effect_noise((width, height), 48).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _unique_image(data: bytes, seq: int) -> bytes:
+    """픽셀은 같고 바이트(→ content id)만 다른 이미지. 타일 캐시 적중을 막는다.
+
+    JPEG은 SOI 뒤에 COM 세그먼트를 넣고, 그 밖의 형식은 끝에 바이트를 덧붙인다.
+    """
+    tag = f"loadtest-{seq}".encode()
+    if data[:2] == b"\xff\xd8":
+        return data[:2] + b"\xff\xfe" + (len(tag) + 2).to_bytes(2, "big") + tag + data[2:]
+    return data + tag
+
+
+def _parse_mix(text: str) -> dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    unknown = set(mix) - {"analyze", "ids", "draft", "figma", "admin"}
+    if unknown:
+        raise SystemExit(f"알 수 없는 요청 종류: {', '.join(sorted(unknown))}")
+    return mix
+
+
+# ── 요청 ──
+def _send(kind: str, url: str, images: list[tuple[str, bytes]], timeout: int, admin_pw: str):
+    files = [("images", (name, data)) for name, data in images]
+    if kind == "analyze":
+        return req.post(f"{url}/analyze", files=files, timeout=timeout)
+    if kind == "figma":
+        return req.post(f"{url}/export-figma", files=files, timeout=timeout)
+    if kind == "draft":
+        return req.post(
+            f"{url}/generate-draft",
+            json={"recommended_structure": SAMPLE_STRUCTURE, "product_name": "부하 테스트"},
+            timeout=timeout,
+        )
+    return req.get(f"{url}/admin", auth=("admin", admin_pw), timeout=timeout)
+
+
+def _send_with_ids(url: str, images: list[tuple[str, bytes]], timeout: int):
+    """브라우저 UI와 같은 흐름: /images 업로드 → image_ids로 /analyze.
+
+    404(다른 워커/캐시 만료)면 한 번 다시 업로드하고, 그래도 404면 multipart로
+    직접 보낸다. (응답, 404를 받은 횟수) 반환.
+    """
+    files = [("images", (name, data)) for name, data in images]
+    misses = 0
+    for _attempt in range(2):
+        upload = req.post(f"{url}/images", files=files, timeout=timeout)
+        if upload.status_code != 200:
+            return upload, misses
+        data = [("image_ids", cid) for cid in upload.json()["image_ids"]]
+        resp = req.post(f"{url}/analyze", data=data, timeout=timeout)
+        if resp.status_code != 404:
+            return resp, misses
+        misses += 1
+    return req.post(f"{url}/analyze", files=files, timeout=timeout), misses
+
+
+_image_seq = itertools.count()
+
+
+def run_level(
+    url, images, concurrency, total, mix, timeout, admin_pw, same_image=False
+) -> dict:
+    """concurrency개 동시 요청으로 mix 비율의 요청 total개를 보내고 통계 반환.
+
+    same_image가 아니면 요청마다 이미지 바이트를 바꿔서 서버 캐시 없이 측정한다.
+    """
+    kinds = random.Random(concurrency).choices(list(mix), weights=list(mix.values()), k=total)
+    latencies = {kind: [] for kind in mix}
+    failures = {kind: 0 for kind in mix}
+    id_misses = 0  # ids 흐름에서 image_ids가 404로 돌아온 횟수
+    lock = threading.Lock()
+
+    def worker(kind):
+        nonlocal id_misses
+        if same_image:
+            payload = images
+        else:
+            seq = next(_image_seq)
+            payload = [(name, _unique_image(data, seq)) for name, data in images]
+        start = time.perf_counter()
+        misses = 0
+        try:
+            if kind == "ids":
+                resp, misses = _send_with_ids(url, payload, timeout)
+            else:
+                resp = _send(kind, url, payload, timeout, admin_pw)
+            ok = resp.status_code == 200
+        except req.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            id_misses += misses
+            if ok:
+                latencies[kind].append(elapsed)
+            else:
+                failures[kind] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, kinds))
+    wall = time.perf_counter() - start
+
+    def summary(values, failed):
+        return {
+            "requests": len(values) + failed,
+            "failures": failed,
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+            "p99": _percentile(values, 99),
+            "throughput": len(values) / wall if wall else 0.0,
+        }
+
+    all_latencies = [v for values in latencies.values() for v in values]
+    return {
+        "concurrency": concurrency,
+        "wall": wall,
+        **summary(all_latencies, sum(failures.values())),
+        "by_kind": {kind: summary(latencies[kind], failures[kind]) for kind in mix},
+        "id_misses": id_misses,
+    }
+
+
+# ── 프로세스 관리 ──
+def _tree_rss(pid: int) -> int:
+    """/proc 기준 pid와 모든 자식 프로세스의 RSS 합 (bytes)."""
+    total = 0
+    stack = [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+            with open(f"/proc/{p}/task/{p}/children") as f:
+                stack.extend(int(c) for c in f.read().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return total
+
+
+class RssSampler:
+    """백그라운드에서 프로세스 트리 RSS를 주기적으로 측정해 최대값을 기록."""
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _tree_rss(self.pid))
+            self._stop.wait(self.interval)
+
+    def reset(self):
+        self.peak = _tree_rss(self.pid)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class AdmissionSampler:
+    """백그라운드에서 /admin/memory를 주기적으로 조회해 동시 분석/대기 수 최대값을 기록.
+
+    gunicorn은 워커별 수용 제어라서 응답한 워커의 값만 보인다.
+    """
+
+    def __init__(self, url: str, admin_pw: str, interval: float = 0.5):
+        self.url = f"{url}/admin/memory"
+        self.auth = ("admin", admin_pw)
+        self.interval = interval
+        self.peak_active = 0
+        self.peak_waiting = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                stats = req.get(self.url, auth=self.auth, timeout=5).json()
+                self.peak_active = max(self.peak_active, stats["active"])
+                self.peak_waiting = max(self.peak_waiting, stats["waiting"])
+            except (req.RequestException, ValueError, KeyError):
+                pass
+            self._stop.wait(self.interval)
+
+    def reset(self):
+        self.peak_active = self.peak_waiting = 0
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"서버 프로세스가 종료됨 (exit {proc.returncode}): {url}")
+        try:
+            req.get(url, timeout=1)
+            return
+        except req.RequestException:
+            time.sleep(0.1)
+    raise TimeoutError(f"{timeout}초 안에 준비되지 않음: {url}")
+
+
+def _start_stub(args) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    proc = subprocess.Popen(
+        [
+            sys.executable, os.path.join(HERE, "loadtest_stub.py"),
+            "--port", str(port),
+            "--latency", str(args.stub_latency),
+            "--tokens-per-sec", str(args.stub_tokens_per_sec),
+            "--error-rate", str(args.stub_error_rate),
+            "--codia-latency", str(args.codia_latency),
+            "--codia-error-rate", str(args.codia_error_rate),
+        ],
+        cwd=HERE,
+    )
+    url = f"http://127.0.0.1:{port}"
+    _wait_ready(url, proc)
+    return proc, url
+
+
+def _start_app(config: str, stub_url: str, db_path: str) -> tuple[subprocess.Popen, str]:
+    """config: 'WxT' (gunicorn workers x threads) 또는 'asgi' (uvicorn asgi:app)."""
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "ANTHROPIC_API_KEY": "stub",
+        "ANTHROPIC_BASE_URL": stub_url,
+        "CODIA_API_KEY": "stub",
+        "CODIA_API_URL": f"{stub_url}/v1/open/image_to_design",
+        "ADMIN_PASSWORD": ADMIN_PASSWORD,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+    })
+    if config == "asgi":
+        cmd = [
+            sys.executable, "-m", "uvicorn", "asgi:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ]
+    else:
+        workers, _, threads = config.partition("x")
+        cmd = [
+            sys.executable, "-m", "gunicorn", "server:app",
+            "--bind", f"127.0.0.1:{port}", "--timeout", "180",
+            "--workers", workers, "--threads", threads or "1",
+            "--log-level", "warning",
+        ]
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env)
+    url = f"http://127.0.0.1:{port}"
+    _wait_ready(url, proc)
+    return proc, url
+
+
+def _stop(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# ── 출력 ──
+def _print_header():
+    print(
+        f"{'config':>8} {'conc':>5} {'reqs':>5} {'fail':>5} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>7} {'peakRSS':>9} {'act/wait':>9}"
+    )
+
+
+def _print_row(config: str, r: dict, peak_rss: int | None):
+    rss = f"{peak_rss / (1024 * 1024):7.1f}MB" if peak_rss else f"{'-':>9}"
+    print(
+        f"{config:>8} {r['concurrency']:>5} {r['requests']:>5} {r['failures']:>5} "
+        f"{r['p50']:>7.2f}s {r['p95']:>7.2f}s {r['p99']:>7.2f}s {r['throughput']:>7.2f} {rss} "
+        f"{r['peak_active']:>4}/{r['peak_waiting']:<4}"
+    )
+    for kind, k in r["by_kind"].items():
+        if k["requests"]:
+            label = f"{kind} (404 {r['id_misses']}회)" if kind == "ids" else kind
+            print(
+                f"{'':>8} {'':>5} {k['requests']:>5} {k['failures']:>5} "
+                f"{k['p50']:>7.2f}s {k['p95']:>7.2f}s {k['p99']:>7.2f}s {'':>7}   {label}"
+            )
+
+
+def _run_levels(config, url, images, args, mix, sampler=None) -> list[dict]:
+    results = []
+    with AdmissionSampler(url, args.admin_password) as admission:
+        for level in args.concurrency:
+            total = args.requests_per_level or level * 4
+            if sampler:
+                sampler.reset()
+            admission.reset()
+            r = run_level(
+                url, images, level, total, mix, args.timeout, args.admin_password,
+                args.same_image,
+            )
+            r["config"] = config
+            r["peak_rss"] = sampler.peak if sampler else None
+            r["peak_active"] = admission.peak_active
+            r["peak_waiting"] = admission.peak_waiting
+            _print_row(config, r, r["peak_rss"])
+            results.append(r)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="이미 떠 있는 서버 (지정하면 --configs 무시)")
+    parser.add_argument("--configs", nargs="+", default=["1x2", "1x8", "asgi"],
+                        help="WxT(gunicorn workers x threads) 또는 asgi")
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("-n", "--requests-per-level", type=int, default=0, help="기본값: 동시성 x 4")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"요청 비율 (기본값: {DEFAULT_MIX})")
+    parser.add_argument("--image", action="append", help="업로드할 이미지 (반복 가능, 기본값: 생성)")
+    parser.add_argument("--image-size", default="1400x6000", help="생성 이미지 크기 WxH")
+    parser.add_argument("--same-image", action="store_true",
+                        help="모든 요청에 같은 이미지 바이트 사용 (타일 캐시 적중 상태 측정)")
+    parser.add_argument("--timeout", type=int, default=300)
+    parser.add_argument("--admin-password", default=ADMIN_PASSWORD)
+    parser.add_argument("--stub-latency", type=float, default=1.0, help="모델 첫 토큰까지 (초)")
+    parser.add_argument("--stub-tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--codia-latency", type=float, default=2.0)
+    parser.add_argument("--codia-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="결과를 JSON 파일로도 저장")
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    if args.image:
+        images = []
+        for path in args.image:
+            with open(path, "rb") as f:
+                images.append((os.path.basename(path), f.read()))
+    else:
+        width, _, height = args.image_size.partition("x")
+        images = [("loadtest.jpg", _make_image(int(width), int(height)))]
+
+    results = []
+    _print_header()
+    if args.url:
+        results += _run_levels("url", args.url.rstrip("/"), images, args, mix)
+    else:
+        stub, stub_url = _start_stub(args)
+        try:
+            for config in args.configs:
+                with tempfile.TemporaryDirectory() as tmp:
+                    app_proc, url = _start_app(config, stub_url, os.path.join(tmp, "loadtest.db"))
+                    try:
+                        with RssSampler(app_proc.pid) as sampler:
+                            results += _run_levels(config, url, images, args, mix, sampler)
+                    finally:
+                        _stop(app_proc)
+        finally:
+            _stop(stub)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""부하 테스트용 로컬 스텁 - Anthropic Messages 스트리밍 API + Codia image_to_design.
+
+    python loadtest_stub.py --port 9100 --latency 1.0 --tokens-per-sec 80 --error-rate 0.02
+
+앱은 아래 환경변수로 스텁을 바라보게 한다.
+
+    ANTHROPIC_BASE_URL=http://127.0.0.1:9100
+    CODIA_API_URL=http://127.0.0.1:9100/v1/open/image_to_design
+
+/v1/messages 는 요청 마지막 텍스트 블록의 ```json 스키마(없으면 SYSTEM_PROMPT의
+스키마)를 그대로 응답 JSON으로 삼아, 첫 토큰까지 --latency 초 대기 후
+--tokens-per-sec 속도로 SSE 이벤트를 흘려보낸다. /v1/open/image_to_design 은
+실제 Codia처럼 image_url을 내려받은 뒤 응답한다.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from prompt import SYSTEM_PROMPT
+
+CHARS_PER_TOKEN = 4
+
+_SCHEMA_RE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+
+config = {
+    "latency": 1.0,  # 첫 토큰까지 대기 (초)
+    "tokens_per_sec": 80.0,
+    "error_rate": 0.0,  # Anthropic 응답 중 529 overloaded 비율
+    "codia_latency": 2.0,
+    "codia_error_rate": 0.0,
+}
+
+
+def _canned_output(body: dict) -> str:
+    """요청에 포함된 출력 스키마를 그대로 채워 넣은 응답 텍스트."""
+    schema_text = None
+    messages = body.get("messages") or []
+    if messages and isinstance(messages[-1].get("content"), list):
+        for block in reversed(messages[-1]["content"]):
+            if block.get("type") == "text":
+                found = _SCHEMA_RE.findall(block["text"])
+                if found:
+                    schema_text = found[-1]
+                break
+    if schema_text is None:
+        schema_text = _SCHEMA_RE.findall(SYSTEM_PROMPT)[-1]
+    return "```json\n" + schema_text + "\n```"
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+async def messages(request):
+    body = await request.json()
+    if random.random() < config["error_rate"]:
+        return JSONResponse(
+            {"type": "error", "error": {"type": "overloaded_error", "message": "stub overloaded"}},
+            status_code=529,
+        )
+
+    text = _canned_output(body)
+    chunks = [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+    delay = 1.0 / config["tokens_per_sec"] if config["tokens_per_sec"] > 0 else 0
+    input_tokens = len(json.dumps(body)) // CHARS_PER_TOKEN
+
+    if not body.get("stream"):
+        await asyncio.sleep(config["latency"] + delay * len(chunks))
+        return JSONResponse({
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": len(chunks)},
+        })
+
+    async def stream():
+        await asyncio.sleep(config["latency"])
+        yield _sse("message_start", {
+            "type": "message_start",
+            "message": {
+                "id": "msg_stub",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "stub"),
+                "content": [],
+                "stop_reason": None,
+                "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+            },
+        })
+        yield _sse("content_block_start", {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "text", "text": ""},
+        })
+        for chunk in chunks:
+            if delay:
+                await asyncio.sleep(delay)
+            yield _sse("content_block_delta", {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": chunk},
+            })
+        yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+        yield _sse("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": len(chunks)},
+        })
+        yield _sse("message_stop", {"type": "message_stop"})
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def image_to_design(request):
+    body = await request.json()
+    await asyncio.sleep(config["codia_latency"])
+    if random.random() < config["codia_error_rate"]:
+        return JSONResponse({"code": 500, "message": "stub error"}, status_code=500)
+
+    image_url = body.get("image_url", "")
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            resp = await client.get(image_url)
+            resp.raise_for_status()
+            size = len(resp.content)
+    except httpx.HTTPError as e:
+        return JSONResponse({"code": 400, "message": f"image fetch failed: {e}"}, status_code=400)
+
+    return JSONResponse({
+        "code": 0,
+        "data": {"image_bytes": size, "document": {"type": "FRAME", "children": []}},
+    })
+
+
+app = Starlette(
+    routes=[
+        Route("/v1/messages", messages, methods=["POST"]),
+        Route("/v1/open/image_to_design", image_to_design, methods=["POST"]),
+    ]
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=config["latency"])
+    parser.add_argument("--tokens-per-sec", type=float, default=config["tokens_per_sec"])
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"])
+    parser.add_argument("--codia-latency", type=float, default=config["codia_latency"])
+    parser.add_argument("--codia-error-rate", type=float, default=config["codia_error_rate"])
+    args = parser.parse_args()
+
+    for key in config:
+        config[key] = getattr(args, key)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
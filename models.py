@@ -18,6 +18,8 @@ class Submission(db.Model):
     brand_name = db.Column(db.String(500))
     category = db.Column(db.String(500))
     overall_score = db.Column(db.Integer)
+    # 분석 결과를 바꿀 때마다 1씩 증가 (워커 간 캐시 무효화용)
+    revision = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     def to_dict(self):
         import json
@@ -1,4 +1,6 @@
-SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지) 구조 분석 엔진 v2.0"입니다.
+import re
+
+PROMPT_INTRO = """당신은 "전환율 중심 상세페이지(랜딩페이지) 구조 분석 엔진 v2.0"입니다.
 
 ## 분석 프레임워크
 
@@ -9,24 +11,30 @@ SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지)
 - Problem(문제 제기) → Affinity(공감) → Solution(해결책) → Offer(제안) → Narrowing(긴급성/한정) → Action(행동 촉구)
 
 이 두 프레임워크를 기준으로 상세페이지의 설득 구조 완성도를 평가하세요.
+"""
 
-## 작업 순서 (반드시 이 순서를 따르세요)
-
-### 1단계: 정밀 OCR (가장 중요!)
+OCR_STEP = """### 1단계: 정밀 OCR (가장 중요!)
 - 이미지에 보이는 **모든 텍스트**를 위→아래 순서로 빠짐없이 읽으세요.
 - 한글, 영문, 숫자, 특수문자를 **한 글자도 빠뜨리지 말고** 정확히 읽으세요.
 - 작은 글씨, 워터마크, 캡션, 버튼 텍스트, 가격 표시도 모두 포함합니다.
 - 글자가 잘 안 보이면 문맥을 활용해 추론하되, 확실하지 않으면 "추정: "을 붙이세요.
 - 브랜드명, 상품명, 가격은 **한 글자씩** 신중하게 읽으세요.
 - 이미지 속 텍스트가 배경과 겹치거나 장식체인 경우에도 최대한 정확히 판독하세요.
+"""
 
+WORK_ORDER = (
+    "## 작업 순서 (반드시 이 순서를 따르세요)\n\n"
+    + OCR_STEP
+    + """
 ### 2단계: 읽은 텍스트와 시각 요소를 근거로 아래 JSON을 작성하세요.
 3단계: 6개 차원별 점수를 100점 만점으로 엄격하게 평가하세요.
 4단계: 강점/약점을 구조화된 객체로 작성하세요.
 5단계: 개선안에 우선순위, 카테고리, 구체적 제안을 포함하세요.
 6단계: 권장 상세페이지 구조(recommended_structure)를 설계하세요.
+"""
+)
 
-## 핵심 규칙
+PROMPT_GUIDE = """## 핵심 규칙
 - product_name, brand_name, price_range, key_copy_text, copy_summary는 **이미지에서 실제로 읽은 원문**을 그대로 적으세요.
 - 이미지에 없는 내용을 지어내지 마세요.
 - 확실하지 않으면 "추정: "을 붙이세요.
@@ -83,18 +91,19 @@ SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지)
 - C  (50~59): 미흡, 상당한 개선 필요
 - D  (40~49): 부족, 전면 재설계 권장
 - F  (0~39): 매우 부족
+"""
 
-## 출력: 아래 JSON만 출력하세요. 다른 텍스트 금지.
-
-```json
-{
+# 출력 JSON 스키마 조각. 키 순서 = 최종 결과의 필드 순서.
+SCHEMA_FIELDS = {
+    "meta": """\
   "product_name": "실제 상품명",
   "brand_name": "실제 브랜드명 (없으면 '확인 불가')",
   "category": "추정: 카테고리",
   "estimated_target": "추정: 타겟 — 근거: ...",
   "price_range": "실제 가격 (없으면 '확인 불가')",
-  "key_copy_text": ["핵심 헤드카피 원문1", "원문2"],
-
+  "key_copy_text": ["핵심 헤드카피 원문1", "원문2"]
+""",
+    "scores": """\
   "scores": {
     "visual": 75,
     "copy": 68,
@@ -104,8 +113,9 @@ SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지)
     "conversion": 65
   },
   "overall_score": 66,
-  "grade": "B",
-
+  "grade": "B"
+""",
+    "framework_analysis": """\
   "framework_analysis": {
     "aidma": {
       "attention": "주의 끌기 분석 — 해당 섹션 번호와 근거",
@@ -122,8 +132,9 @@ SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지)
       "narrowing": "긴급성/한정 분석",
       "action": "행동 촉구 분석"
     }
-  },
-
+  }
+""",
+    "sections": """\
   "sections": [
     {
       "order": 1,
@@ -137,26 +148,30 @@ SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지)
       "section_score": 75,
       "improvement_suggestion": "이 섹션의 구체적 개선 제안"
     }
-  ],
-
-  "overall_structure": "구조 흐름 설명 (예: 공감→문제→해결→증거→CTA)",
-
+  ]
+""",
+    "overall_structure": """\
+  "overall_structure": "구조 흐름 설명 (예: 공감→문제→해결→증거→CTA)"
+""",
+    "strengths": """\
   "strengths": [
     {
       "title": "강점 제목",
       "detail": "구체적 설명 — 어떤 부분이 왜 좋은지",
       "impact": "전환율에 미치는 긍정적 영향"
     }
-  ],
-
+  ]
+""",
+    "weaknesses": """\
   "weaknesses": [
     {
       "title": "약점 제목",
       "detail": "구체적 설명 — 어떤 부분이 왜 문제인지",
       "impact": "전환율에 미치는 부정적 영향"
     }
-  ],
-
+  ]
+""",
+    "conversion_improvement_points": """\
   "conversion_improvement_points": [
     {
       "priority": "상",
@@ -167,8 +182,9 @@ SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지)
       "suggestion": "구체적 개선 방법",
       "expected_effect": "예상 효과"
     }
-  ],
-
+  ]
+""",
+    "recommended_structure": """\
   "recommended_structure": [
     {
       "order": 1,
@@ -182,7 +198,102 @@ SYSTEM_PROMPT = """당신은 "전환율 중심 상세페이지(랜딩페이지)
       "color_mood": "컬러/분위기 (예: 따뜻한 톤, 임팩트 있는 대비)"
     }
   ]
+""",
 }
-```"""
+
+
+def output_schema(*groups: str) -> str:
+    """SCHEMA_FIELDS 중 groups만 포함한 출력 지시문."""
+    body = ",\n\n".join(SCHEMA_FIELDS[g].rstrip("\n") for g in groups)
+    return (
+        "## 출력: 아래 JSON만 출력하세요. 다른 텍스트 금지.\n\n"
+        "```json\n{\n" + body + "\n}\n```"
+    )
+
+
+SYSTEM_PROMPT = (
+    PROMPT_INTRO
+    + "\n"
+    + WORK_ORDER
+    + "\n"
+    + PROMPT_GUIDE
+    + "\n"
+    + output_schema(*SCHEMA_FIELDS)
+)
+
+# 최종 결과 JSON의 최상위 필드 (출력 스키마 순서)
+ANALYSIS_FIELDS = tuple(
+    re.findall(r'^  "(\w+)":', "\n".join(SCHEMA_FIELDS.values()), re.MULTILINE)
+)
 
 USER_PROMPT = "이 상세페이지 이미지를 분석해주세요. 먼저 모든 텍스트를 꼼꼼히 읽은 후, 6차원 점수 평가와 AIDMA/PASONA 프레임워크 분석을 포함하여 JSON으로 출력하세요."
+
+# ── 분할 분석 모드 ──
+# 모든 파트가 같은 system + 이미지 블록을 공유해서 프롬프트 캐시를 재사용하고,
+# 파트별 지시문/출력 스키마는 user 텍스트로 전달한다.
+SPLIT_SYSTEM_PROMPT = PROMPT_INTRO + "\n" + PROMPT_GUIDE
+
+# 1단계: OCR + 섹션 구조. 이 결과가 2단계 파트들의 근거(context)가 된다.
+STRUCTURE_PROMPT = (
+    "이 상세페이지 이미지를 분석해주세요.\n\n"
+    + OCR_STEP
+    + "\n### 2단계: 읽은 텍스트와 시각 요소를 근거로 상품 정보와 섹션 구조를 아래 JSON으로 작성하세요.\n\n"
+    + output_schema("meta", "sections", "overall_structure")
+)
+
+# 2단계 파트들 (병렬 실행). {part_name: (지시문, 스키마 그룹)}
+SPLIT_PARTS = {
+    "scoring": (
+        "이미지와 위 결과를 근거로 6개 차원별 점수를 100점 만점으로 엄격하게 평가하고, "
+        "AIDMA/PASONA 프레임워크 분석을 작성하세요.\n\n"
+        + output_schema("scores", "framework_analysis")
+    ),
+    "recommendations": (
+        "이미지와 위 결과를 근거로 강점/약점을 구조화된 객체로 작성하고, "
+        "개선안에 우선순위, 카테고리, 구체적 제안을 포함하고, "
+        "권장 상세페이지 구조(recommended_structure)를 설계하세요.\n\n"
+        + output_schema(
+            "strengths",
+            "weaknesses",
+            "conversion_improvement_points",
+            "recommended_structure",
+        )
+    ),
+}
+
+
+def with_context(
+    prompt: str, context_json: str, label: str = "OCR/섹션 분석 결과"
+) -> str:
+    """앞 단계 결과(JSON 문자열)를 다음 단계 지시문 앞에 붙인다. label은 결과 이름."""
+    return (
+        f"아래는 이 상세페이지 이미지에서 먼저 추출한 {label}입니다.\n\n"
+        "```json\n" + context_json + "\n```\n\n" + prompt
+    )
+
+
+# ── 2단계(빠른 스캔 → 심층 분석) 모드 ──
+# 빠른 스캔: 상품 정보 + 6개 점수만 짧게 출력. SPLIT_SYSTEM_PROMPT와 이미지
+# 블록을 공유하므로 뒤이은 심층 분석이 같은 캐시를 재사용한다.
+QUICK_PROMPT = (
+    "이 상세페이지 이미지를 빠르게 분류해주세요. 핵심 헤드카피, 상품명, 브랜드명, "
+    "가격을 정확히 읽고, 6개 차원별 점수를 100점 만점으로 엄격하게 평가하세요. "
+    "섹션별 분석과 개선안은 작성하지 마세요.\n\n"
+    + output_schema("meta", "scores")
+)
+
+# 심층 분석 1단계: 빠른 스캔 결과를 context로 섹션 구조만 작성.
+DEEP_STRUCTURE_PROMPT = (
+    OCR_STEP
+    + "\n### 2단계: 읽은 텍스트와 시각 요소를 근거로 섹션 구조를 아래 JSON으로 작성하세요.\n\n"
+    + output_schema("sections", "overall_structure")
+)
+
+# 심층 분석 2단계 파트들 (병렬 실행). 점수는 빠른 스캔 결과를 유지한다.
+DEEP_PARTS = {
+    "framework": (
+        "이미지와 위 결과를 근거로 AIDMA/PASONA 프레임워크 분석을 작성하세요.\n\n"
+        + output_schema("framework_analysis")
+    ),
+    "recommendations": SPLIT_PARTS["recommendations"],
+}
@@ -1,11 +1,14 @@
 import io
 import json
 import os
+import sys
+import threading
 import time
 import uuid as uuid_mod
+from collections import OrderedDict
 from functools import wraps
 
-import requests as req
+import sqlalchemy as sa
 from dotenv import load_dotenv
 from flask import (
     Flask,
@@ -15,14 +18,29 @@ from flask import (
     render_template,
     request,
     send_file,
+    stream_with_context,
 )
 
-from analyzer import analyze_page
-from draft_generator import generate_draft_svg
-from models import Submission, db
+# image_store 등 모듈 수준에서 환경변수를 읽는 프로젝트 모듈보다 먼저 .env를 읽는다
+load_dotenv()
+
+import image_store  # noqa: E402
+from draft_generator import generate_draft_svg  # noqa: E402
+from models import Submission, db  # noqa: E402
+from prompt import ANALYSIS_FIELDS  # noqa: E402
+
+MEDIA_MAP = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
 
 # ── Temp image store for Codia API ──
-_temp_images = {}  # {uuid_str: {"data": bytes, "media_type": str, "created": float}}
+# {uuid_str: {"data": bytes, "media_type": str, "created": float}}
+# Codia가 가져갈 때까지 바이트를 직접 들고 있는다 (image_store LRU에서 제거되어도
+# 404가 나지 않도록). image_ids로 받은 이미지는 image_store와 같은 bytes 객체를 공유한다.
+_temp_images = {}
 
 
 def _cleanup_temp_images():
@@ -32,7 +50,189 @@ def _cleanup_temp_images():
     for k in expired:
         del _temp_images[k]
 
-load_dotenv()
+
+def add_temp_image(data: bytes, media_type: str) -> str:
+    """1회용 /temp-image id 발급."""
+    img_id = str(uuid_mod.uuid4())
+    _temp_images[img_id] = {
+        "data": data,
+        "media_type": media_type,
+        "created": time.time(),
+    }
+    return img_id
+
+
+def media_type_for(filename: str) -> str:
+    """파일 확장자로 media type 추정."""
+    ext = filename.rsplit(".", 1)[-1].lower()
+    return MEDIA_MAP.get(ext, "image/jpeg")
+
+
+def images_from_request() -> list[tuple[bytes, str]]:
+    """요청의 이미지 목록. image_ids(/images로 업로드한 id) 또는 multipart images.
+
+    저장소에 없는 id가 있으면 해당 id 목록으로 LookupError.
+    """
+    ids = request.form.getlist("image_ids")
+    if not ids:
+        return [
+            (f.read(), media_type_for(f.filename))
+            for f in request.files.getlist("images")
+        ]
+    return resolve_image_ids(ids)
+
+
+def resolve_image_ids(ids: list[str]) -> list[tuple[bytes, str]]:
+    images, missing = [], []
+    for cid in ids:
+        entry = image_store.get_image(cid)
+        if entry is None:
+            missing.append(cid)
+        else:
+            images.append(entry)
+    if missing:
+        raise LookupError(missing)
+    return images
+
+
+def _missing_images_response(e: LookupError):
+    return (
+        jsonify({
+            "error": "이미지를 찾을 수 없습니다. 다시 업로드해주세요.",
+            "missing_image_ids": e.args[0],
+        }),
+        404,
+    )
+
+
+def overall_score_of(result: dict):
+    """overall_score가 없으면 6개 점수 평균으로 계산."""
+    score = result.get("overall_score")
+    if score is None and "scores" in result:
+        scores = result["scores"]
+        vals = [v for v in scores.values() if isinstance(v, (int, float))]
+        if vals:
+            score = round(sum(vals) / len(vals))
+    return score
+
+
+def _apply_result(submission: Submission, result: dict):
+    submission.analysis_result = json.dumps(result, ensure_ascii=False)
+    submission.product_name = result.get("product_name", "")
+    submission.brand_name = result.get("brand_name", "")
+    submission.category = result.get("category", "")
+    submission.overall_score = overall_score_of(result)
+    # 동시에 갱신해도 증가분이 사라지지 않도록 DB에서 증가
+    submission.revision = (
+        1 if submission.revision is None else Submission.revision + 1
+    )
+
+
+def save_submission(result: dict, image_count: int) -> Submission:
+    """분석 결과를 Submission으로 저장. app context 안에서 호출해야 함."""
+    ensure_schema()
+    submission = Submission(image_count=image_count)
+    _apply_result(submission, result)
+    db.session.add(submission)
+    db.session.commit()
+    return submission
+
+
+def update_submission(submission: Submission, result: dict) -> Submission:
+    """기존 Submission의 분석 결과를 교체 (빠른 스캔 → 심층 분석)."""
+    _apply_result(submission, result)
+    db.session.commit()
+    _invalidate_detail(submission.id)
+    return submission
+
+
+# ── Admin detail cache (렌더링된 HTML) ──
+# 워커가 여러 개면 다른 워커의 쓰기를 알 수 없으므로, 캐시 항목마다
+# Submission.revision을 함께 저장하고 조회 때마다 DB의 revision과 비교한다.
+DETAIL_CACHE_SIZE = 200
+_detail_cache = OrderedDict()  # {submission_id: (revision, html)}
+_detail_cache_lock = threading.Lock()
+
+
+def _invalidate_detail(sub_id: int):
+    with _detail_cache_lock:
+        _detail_cache.pop(sub_id, None)
+
+
+def _detail_version(sub_id: int):
+    """Submission의 현재 revision (정수 컬럼 1개만 읽음). 없으면 None."""
+    return db.session.execute(
+        sa.select(Submission.revision).where(Submission.id == sub_id)
+    ).scalar()
+
+
+# ── Field-projected submission API ──
+API_COLUMNS = (
+    "created_at",
+    "image_count",
+    "product_name",
+    "brand_name",
+    "category",
+    "overall_score",
+)
+API_ANALYSIS_FIELDS = ANALYSIS_FIELDS + ("analysis_stage",)
+
+
+def _analysis_field(name: str):
+    """analysis_result(Text)의 최상위 필드를 DB에서 추출하는 JSON 표현식."""
+    if db.engine.dialect.name == "postgresql":
+        doc = sa.cast(Submission.analysis_result, sa.JSON)
+    else:
+        # SQLite/MySQL은 텍스트 컬럼에 JSON 함수를 바로 쓸 수 있다 (CAST 불필요)
+        doc = sa.type_coerce(Submission.analysis_result, sa.JSON)
+    return doc[name].label(name)
+
+
+# ── Pending deep analyses (빠른 스캔 후 심층 분석 대기) ──
+# 원본 이미지는 image_store(IMAGE_STORE_MB 상한)에 두고 content id만 보관한다.
+# 심층 분석은 이미지를 다시 꺼내 admission 예산 안에서 실행하며, 백그라운드
+# 실행은 DEEP_WORKERS개 스레드로 제한한다.
+DEEP_TTL = 1800  # seconds
+MAX_PENDING_DEEP = 20
+DEEP_WORKERS = int(os.getenv("DEEP_WORKERS", "2"))
+# {submission_id: {"content_ids": list[str], "quick": dict, "created": float}}
+_pending_deep = {}
+_running_deep = set()  # 심층 분석이 진행(또는 대기열에 있는) submission id
+_pending_lock = threading.Lock()
+_deep_pool = None
+
+
+class DeepInProgress(Exception):
+    """같은 Submission의 심층 분석이 이미 진행 중."""
+
+
+def _cleanup_pending_deep():
+    """DEEP_TTL이 지났거나 MAX_PENDING_DEEP를 넘는 오래된 항목 삭제."""
+    now = time.time()
+    with _pending_lock:
+        expired = [k for k, v in _pending_deep.items() if now - v["created"] > DEEP_TTL]
+        for k in expired:
+            del _pending_deep[k]
+        while len(_pending_deep) > MAX_PENDING_DEEP:
+            oldest = min(_pending_deep, key=lambda k: _pending_deep[k]["created"])
+            del _pending_deep[oldest]
+
+
+def _get_deep_pool():
+    global _deep_pool
+    with _pending_lock:
+        if _deep_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _deep_pool = ThreadPoolExecutor(
+                max_workers=DEEP_WORKERS, thread_name_prefix="deep"
+            )
+        return _deep_pool
+
+
+CODIA_URL = os.getenv(
+    "CODIA_API_URL", "https://api.codia.ai/v1/open/image_to_design"
+)
 
 app = Flask(__name__)
 app.config["MAX_CONTENT_LENGTH"] = 30 * 1024 * 1024  # 30MB
@@ -45,8 +245,65 @@ app.config["SQLALCHEMY_DATABASE_URI"] = database_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 db.init_app(app)
-with app.app_context():
-    db.create_all()
+
+# ── Lazy startup ──
+# 콜드 스타트 시 첫 응답을 빨리 보내기 위해 스키마 확인과 무거운 import
+# (anthropic, PIL, requests)는 처음 필요할 때까지 미룬다.
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def ensure_schema():
+    """db.create_all()을 프로세스당 1회만 실행.
+
+    create_all은 기존 테이블에 컬럼을 추가하지 않으므로, 이전 버전에서 만든
+    submissions 테이블이면 revision 컬럼을 직접 추가한다.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with app.app_context():
+            db.create_all()
+            columns = {c["name"] for c in sa.inspect(db.engine).get_columns("submissions")}
+            if "revision" not in columns:
+                with db.engine.begin() as conn:
+                    conn.execute(sa.text(
+                        "ALTER TABLE submissions "
+                        "ADD COLUMN revision INTEGER NOT NULL DEFAULT 1"
+                    ))
+        _schema_ready = True
+
+
+def _warmup():
+    """포트 바인딩 이후 백그라운드에서 무거운 모듈 import + 스키마 확인."""
+    try:
+        import analyzer  # noqa: F401
+        import requests  # noqa: F401
+
+        ensure_schema()
+    except Exception as e:
+        app.logger.warning(f"워밍업 실패: {e}")
+
+
+_warmup_started = False
+
+
+def start_warmup():
+    """WARMUP=1이면 워밍업 스레드를 프로세스당 1회 시작."""
+    global _warmup_started
+    if _warmup_started or os.getenv("WARMUP", "1") != "1":
+        return
+    _warmup_started = True
+    threading.Thread(target=_warmup, name="warmup", daemon=True).start()
+
+
+# gunicorn은 마스터가 포트를 바인딩한 뒤 워커에서 이 모듈을 import하므로 여기서 시작한다.
+# uvicorn asgi:app은 바인딩 전에 asgi를 거쳐 import하므로 asgi.py의 lifespan에서 시작한다.
+if "asgi" not in sys.modules:
+    start_warmup()
 
 
 @app.errorhandler(413)
@@ -68,6 +325,7 @@ def require_admin(f):
                 401,
                 {"WWW-Authenticate": 'Basic realm="Admin"'},
             )
+        ensure_schema()
         return f(*args, **kwargs)
 
     return decorated
@@ -79,57 +337,215 @@ def index():
     return render_template("index.html")
 
 
+class _UnreadableImage(Exception):
+    pass
+
+
+def _run_admitted(image_list: list[tuple[bytes, str]], analyze_fn, *args):
+    """예상 메모리를 admission 예산에 예약한 상태로 analyze_fn(image_list, *args) 실행.
+
+    디코딩 최대치 + payload로 들어간 뒤, 이미지 처리가 끝나면 모델 응답을 기다리는
+    동안은 payload만 예약해 둔다.
+    """
+    from admission import controller, estimate_request_bytes
+
+    try:
+        needed, payload = estimate_request_bytes(image_list)
+    except Exception as e:
+        app.logger.warning(f"이미지 헤더 읽기 실패: {e}")
+        raise _UnreadableImage("이미지를 읽을 수 없습니다.") from e
+
+    with controller.reserve(needed) as reservation:
+        return analyze_fn(
+            image_list, *args, on_images_ready=lambda: reservation.shrink(payload)
+        )
+
+
+def _analysis_error_response(e: Exception, label: str):
+    from admission import AdmissionRejected, AdmissionTimeout
+
+    if isinstance(e, _UnreadableImage):
+        return jsonify({"error": str(e)}), 400
+    if isinstance(e, (AdmissionRejected, image_store.ImageTooLarge)):
+        return jsonify({"error": str(e)}), 413
+    if isinstance(e, AdmissionTimeout):
+        return jsonify({"error": str(e)}), 503
+    app.logger.error(f"{label}: {e}")
+    return jsonify({"error": str(e)}), 500
+
+
 @app.route("/analyze", methods=["POST"])
 def analyze():
     api_key = os.getenv("ANTHROPIC_API_KEY", "")
     if not api_key:
         return jsonify({"error": "서버에 API 키가 설정되지 않았습니다."}), 500
 
-    files = request.files.getlist("images")
-    if not files:
+    try:
+        image_list = images_from_request()
+    except LookupError as e:
+        return _missing_images_response(e)
+    if not image_list:
         return jsonify({"error": "이미지를 업로드해주세요."}), 400
+    image_count = len(image_list)
 
-    MEDIA_MAP = {
-        "jpg": "image/jpeg",
-        "jpeg": "image/jpeg",
-        "png": "image/png",
-        "webp": "image/webp",
-    }
+    from analyzer import analyze_page, analyze_page_split
 
-    image_list = []
-    for f in files:
-        ext = f.filename.rsplit(".", 1)[-1].lower()
-        media_type = MEDIA_MAP.get(ext, "image/jpeg")
-        image_list.append((f.read(), media_type))
+    # mode=split: 스키마를 나눠 병렬 호출 (기본값은 ANALYSIS_MODE 환경변수)
+    mode = request.form.get("mode") or os.getenv("ANALYSIS_MODE", "single")
+    analyze_fn = analyze_page_split if mode == "split" else analyze_page
 
     try:
-        result = analyze_page(image_list, api_key)
+        result = _run_admitted(image_list, analyze_fn, api_key)
         del image_list  # free memory
 
-        # Extract overall_score
-        score = result.get("overall_score")
-        if score is None and "scores" in result:
-            scores = result["scores"]
-            vals = [v for v in scores.values() if isinstance(v, (int, float))]
-            if vals:
-                score = round(sum(vals) / len(vals))
-
-        # Save to DB
-        submission = Submission(
-            image_count=len(files),
-            analysis_result=json.dumps(result, ensure_ascii=False),
-            product_name=result.get("product_name", ""),
-            brand_name=result.get("brand_name", ""),
-            category=result.get("category", ""),
-            overall_score=score,
-        )
-        db.session.add(submission)
-        db.session.commit()
+        save_submission(result, image_count)
 
         return jsonify(result)
     except Exception as e:
-        app.logger.error(f"분석 오류: {e}")
-        return jsonify({"error": str(e)}), 500
+        return _analysis_error_response(e, "분석 오류")
+
+
+@app.route("/analyze/quick", methods=["POST"])
+def analyze_quick():
+    """빠른 스캔: 상품 정보 + 6개 점수만 반환하고 Submission 저장.
+
+    deep=background 이면 심층 분석을 백그라운드에서 이어서 실행하고, 아니면
+    /analyze/deep/<submission_id> 로 나중에 요청할 수 있다 (DEEP_TTL 이내).
+    """
+    api_key = os.getenv("ANTHROPIC_API_KEY", "")
+    if not api_key:
+        return jsonify({"error": "서버에 API 키가 설정되지 않았습니다."}), 500
+
+    try:
+        image_list = images_from_request()
+    except LookupError as e:
+        return _missing_images_response(e)
+    if not image_list:
+        return jsonify({"error": "이미지를 업로드해주세요."}), 400
+    image_count = len(image_list)
+
+    from analyzer import analyze_page_quick
+
+    try:
+        # 심층 분석용 원본은 image_store에 두고 id만 보관 (이미 있으면 공유).
+        # 분석 중 image_list의 원본은 비워지므로 먼저 저장한다.
+        content_ids = [image_store.put_image(data, mt) for data, mt in image_list]
+
+        result = _run_admitted(image_list, analyze_page_quick, api_key)
+        del image_list  # free memory
+        result["analysis_stage"] = "quick"
+        submission = save_submission(result, image_count)
+    except Exception as e:
+        return _analysis_error_response(e, "빠른 스캔 오류")
+
+    _cleanup_pending_deep()
+    with _pending_lock:
+        _pending_deep[submission.id] = {
+            "content_ids": content_ids,
+            "quick": result,
+            "created": time.time(),
+        }
+
+    if request.form.get("deep") == "background":
+        pending = _claim_deep(submission.id)
+        _get_deep_pool().submit(
+            _run_deep_in_background, submission.id, pending, api_key
+        )
+
+    return jsonify({**result, "submission_id": submission.id})
+
+
+def _claim_deep(sub_id: int) -> dict:
+    """대기 항목을 꺼내 진행 중으로 표시. 진행 중이면 DeepInProgress, 없으면 LookupError."""
+    with _pending_lock:
+        if sub_id in _running_deep:
+            raise DeepInProgress("심층 분석이 이미 진행 중입니다.")
+        pending = _pending_deep.pop(sub_id, None)
+        if pending is None:
+            raise LookupError(
+                "심층 분석할 원본 이미지가 만료되었습니다. 다시 업로드해주세요."
+            )
+        _running_deep.add(sub_id)
+        return pending
+
+
+def _run_deep(sub_id: int, pending: dict, api_key: str) -> dict:
+    """_claim_deep으로 꺼낸 항목을 심층 분석 후 Submission 갱신.
+
+    분석이 실패하면 다시 요청할 수 있도록 대기 항목을 되돌린다.
+    """
+    from analyzer import analyze_page_deep
+
+    try:
+        try:
+            image_list = resolve_image_ids(pending["content_ids"])
+        except LookupError:
+            raise LookupError(
+                "심층 분석할 원본 이미지가 만료되었습니다. 다시 업로드해주세요."
+            ) from None
+
+        try:
+            result = _run_admitted(
+                image_list, analyze_page_deep, pending["quick"], api_key
+            )
+        except Exception:
+            with _pending_lock:
+                _pending_deep.setdefault(sub_id, pending)
+            raise
+    finally:
+        with _pending_lock:
+            _running_deep.discard(sub_id)
+
+    result["analysis_stage"] = "deep"
+    submission = db.session.get(Submission, sub_id)
+    if submission is None:
+        raise LookupError("분석 기록을 찾을 수 없습니다.")
+    update_submission(submission, result)
+    return result
+
+
+def _run_deep_in_background(sub_id: int, pending: dict, api_key: str):
+    with app.app_context():
+        try:
+            _run_deep(sub_id, pending, api_key)
+        except Exception as e:
+            app.logger.error(f"심층 분석 오류 (submission {sub_id}): {e}")
+
+
+@app.route("/analyze/deep/<int:sub_id>", methods=["POST"])
+def analyze_deep(sub_id):
+    """빠른 스캔한 Submission에 섹션/프레임워크/추천 구조를 채운다.
+
+    이미 심층 분석이 끝났으면 저장된 결과, 진행 중이면 409, 원본 이미지가
+    만료되었으면 410.
+    """
+    api_key = os.getenv("ANTHROPIC_API_KEY", "")
+    if not api_key:
+        return jsonify({"error": "서버에 API 키가 설정되지 않았습니다."}), 500
+
+    try:
+        pending = _claim_deep(sub_id)
+    except DeepInProgress as e:
+        return jsonify({"error": str(e)}), 409
+    except LookupError as e:
+        ensure_schema()
+        submission = db.session.get(Submission, sub_id)
+        if submission is None:
+            return jsonify({"error": "분석 기록을 찾을 수 없습니다."}), 404
+        stored = (
+            json.loads(submission.analysis_result) if submission.analysis_result else {}
+        )
+        if stored.get("analysis_stage") == "deep":
+            return jsonify({**stored, "submission_id": sub_id})
+        return jsonify({"error": str(e)}), 410
+
+    try:
+        result = _run_deep(sub_id, pending, api_key)
+        return jsonify({**result, "submission_id": sub_id})
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 410
+    except Exception as e:
+        return _analysis_error_response(e, "심층 분석 오류")
 
 
 @app.route("/generate-draft", methods=["POST"])
@@ -160,25 +576,25 @@ def export_figma():
     if not codia_key:
         return jsonify({"error": "CODIA_API_KEY가 설정되지 않았습니다."}), 500
 
-    files = request.files.getlist("images")
-    if not files:
+    import requests as req
+
+    try:
+        image_list = images_from_request()
+    except LookupError as e:
+        return _missing_images_response(e)
+    if not image_list:
         return jsonify({"error": "이미지를 업로드해주세요."}), 400
 
     _cleanup_temp_images()
 
     results = []
-    for f in files:
-        img_id = str(uuid_mod.uuid4())
-        _temp_images[img_id] = {
-            "data": f.read(),
-            "media_type": f.content_type or "image/jpeg",
-            "created": time.time(),
-        }
+    for data, media_type in image_list:
+        img_id = add_temp_image(data, media_type)
         image_url = f"{request.host_url}temp-image/{img_id}"
 
         try:
             resp = req.post(
-                "https://api.codia.ai/v1/open/image_to_design",
+                CODIA_URL,
                 headers={
                     "Authorization": f"Bearer {codia_key}",
                     "Content-Type": "application/json",
@@ -197,14 +613,42 @@ def export_figma():
 
 @app.route("/temp-image/<image_id>")
 def temp_image(image_id):
-    entry = _temp_images.get(image_id)
+    entry = _temp_images.pop(image_id, None)  # 한 번 서빙 후 삭제
     if not entry:
         abort(404, "이미지를 찾을 수 없습니다.")
-    data = entry["data"]
-    media_type = entry["media_type"]
-    # 한 번 서빙 후 삭제
-    del _temp_images[image_id]
-    return send_file(io.BytesIO(data), mimetype=media_type)
+    return send_file(io.BytesIO(entry["data"]), mimetype=entry["media_type"])
+
+
+@app.route("/images", methods=["POST"])
+def upload_images():
+    """이미지를 한 번만 업로드하고 content id를 받는다.
+
+    /analyze, /analyze/quick, /export-figma 에 image_ids로 넘기면 같은 이미지를
+    다시 업로드하지 않고, 분석용 타일 처리 결과도 캐시에서 재사용한다.
+    """
+    files = request.files.getlist("images")
+    if not files:
+        return jsonify({"error": "이미지를 업로드해주세요."}), 400
+
+    try:
+        ids = [
+            image_store.put_image(f.read(), media_type_for(f.filename))
+            for f in files
+        ]
+    except image_store.ImageTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+
+    # 저장소 상한보다 큰 업로드는 앞서 넣은 이미지를 밀어낼 수 있다
+    missing = [cid for cid in ids if image_store.get_image(cid) is None]
+    if missing:
+        return (
+            jsonify({
+                "error": "이미지 전체 용량이 너무 큽니다. 나눠서 업로드해주세요.",
+                "missing_image_ids": missing,
+            }),
+            413,
+        )
+    return jsonify({"image_ids": ids})
 
 
 # ── Admin routes ──
@@ -222,14 +666,75 @@ def admin_list():
 @app.route("/admin/submission/<int:sub_id>")
 @require_admin
 def admin_detail(sub_id):
+    version = _detail_version(sub_id)
+    if version is None:
+        abort(404)
+
+    with _detail_cache_lock:
+        cached = _detail_cache.get(sub_id)
+        if cached is not None and cached[0] == version:
+            _detail_cache.move_to_end(sub_id)
+            return cached[1]
+
     submission = Submission.query.get_or_404(sub_id)
     analysis = (
         json.loads(submission.analysis_result) if submission.analysis_result else {}
     )
-    return render_template(
+    html = render_template(
         "admin_detail.html", submission=submission, analysis=analysis
     )
 
+    with _detail_cache_lock:
+        _detail_cache[sub_id] = (version, html)
+        _detail_cache.move_to_end(sub_id)
+        while len(_detail_cache) > DETAIL_CACHE_SIZE:
+            _detail_cache.popitem(last=False)
+    return html
+
+
+@app.route("/api/submissions/<int:sub_id>")
+@require_admin
+def api_submission(sub_id):
+    """제출 조회. ?fields=scores,sections 처럼 필요한 필드만 DB에서 추출해서 반환."""
+    fields_arg = request.args.get("fields")
+    if not fields_arg:
+        return jsonify(Submission.query.get_or_404(sub_id).to_dict())
+
+    fields = list(dict.fromkeys(f.strip() for f in fields_arg.split(",") if f.strip()))
+    fields = [f for f in fields if f != "id"]  # id는 항상 포함
+    unknown = [
+        f for f in fields if f not in API_COLUMNS and f not in API_ANALYSIS_FIELDS
+    ]
+    if unknown:
+        return jsonify({"error": f"알 수 없는 필드: {', '.join(unknown)}"}), 400
+
+    exprs = [Submission.id]
+    for f in fields:
+        if f in API_COLUMNS:
+            exprs.append(getattr(Submission, f))
+        else:
+            exprs.append(_analysis_field(f))
+
+    row = db.session.execute(
+        sa.select(*exprs).where(Submission.id == sub_id)
+    ).first()
+    if row is None:
+        abort(404)
+
+    data = row._asdict()
+    if data.get("created_at") is not None:
+        data["created_at"] = data["created_at"].isoformat()
+    return jsonify(data)
+
+
+@app.route("/admin/memory")
+@require_admin
+def admin_memory():
+    """분석 수용 제어 현황 (예산/예약 메모리/진행·대기 중 작업 수) + 이미지 캐시."""
+    from admission import controller
+
+    return jsonify({**controller.stats(), "image_cache": image_store.stats()})
+
 
 @app.route("/admin/export")
 @require_admin
@@ -257,5 +762,84 @@ def admin_export_full():
     )
 
 
+def _columnar_export_stmt(dialect_name: str):
+    """컬럼형 내보내기 SELECT. analysis_result는 행마다 한 번만 JSON으로 해석한다.
+
+    PostgreSQL은 jsonb로 한 번 캐스트한다 (OFFSET 0으로 서브쿼리가 펼쳐져 필드마다
+    CAST가 반복되지 않게 막는다). 그 밖의 DB는 텍스트에 JSON 함수를 바로 쓴다.
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import JSONB
+
+        doc = sa.cast(Submission.analysis_result, JSONB)
+    else:
+        doc = sa.type_coerce(Submission.analysis_result, sa.JSON)
+    columns = sa.select(
+        Submission.id,
+        Submission.created_at,
+        Submission.image_count,
+        Submission.product_name,
+        Submission.brand_name,
+        Submission.category,
+        Submission.overall_score,
+        doc.label("doc"),
+    )
+    if dialect_name == "postgresql":
+        columns = columns.offset(0)
+    rows = columns.subquery("rows")
+
+    return sa.select(
+        *(c for c in rows.c if c.name != "doc"),
+        *(
+            rows.c.doc[name].label(name)
+            for name in ("analysis_stage", "grade", "scores", "sections")
+        ),
+    ).order_by(rows.c.id)
+
+
+@app.route("/admin/export-columnar")
+@require_admin
+def admin_export_columnar():
+    """평탄화된 컬럼형 내보내기. ?format=parquet(기본)|arrow|csv
+
+    pyarrow가 없으면 CSV로 내보낸다.
+    """
+    from columnar_export import (
+        ROW_GROUP_SIZE,
+        has_pyarrow,
+        iter_arrow,
+        iter_csv,
+        iter_parquet,
+    )
+
+    fmt = request.args.get("format", "parquet")
+    if fmt not in ("parquet", "arrow", "csv"):
+        return jsonify({"error": "format은 parquet, arrow, csv 중 하나여야 합니다."}), 400
+    if fmt != "csv" and not has_pyarrow():
+        fmt = "csv"
+
+    stmt = _columnar_export_stmt(db.engine.dialect.name).execution_options(
+        yield_per=ROW_GROUP_SIZE
+    )
+
+    def batches():
+        for partition in db.session.execute(stmt).mappings().partitions():
+            yield partition
+
+    writers = {
+        "parquet": (iter_parquet, "application/vnd.apache.parquet", "parquet"),
+        "arrow": (iter_arrow, "application/vnd.apache.arrow.stream", "arrows"),
+        "csv": (iter_csv, "text/csv; charset=utf-8", "csv"),
+    }
+    write, mimetype, ext = writers[fmt]
+    return Response(
+        stream_with_context(write(batches())),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=sangpe_export_flat.{ext}"
+        },
+    )
+
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# server를 import 하기 전에: 테스트용 SQLite 파일, 워밍업 스레드 끔
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="sangpe-test-"), "test.db"
+)
+os.environ["WARMUP"] = "0"
@@ -0,0 +1,204 @@
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from admission import (
+    AdmissionController,
+    AdmissionRejected,
+    AdmissionTimeout,
+    estimate_image_bytes,
+    estimate_payload_bytes,
+    estimate_request_bytes,
+)
+from analyzer import MAX_TILE_BYTES
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_reserve_and_release_updates_stats():
+    controller = AdmissionController(100)
+    with controller.reserve(60):
+        assert controller.stats()["reserved_bytes"] == 60
+        assert controller.stats()["active"] == 1
+    assert controller.stats() == {
+        "budget_bytes": 100,
+        "reserved_bytes": 0,
+        "active": 0,
+        "waiting": 0,
+    }
+
+
+def test_request_larger_than_budget_is_rejected():
+    controller = AdmissionController(100)
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(101)
+
+
+def test_waiter_times_out_and_leaves_queue():
+    controller = AdmissionController(100)
+    controller.acquire(80)
+    with pytest.raises(AdmissionTimeout):
+        controller.acquire(30, timeout=0.05)
+    assert controller.stats()["waiting"] == 0
+    assert controller.stats()["reserved_bytes"] == 80
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    controller = AdmissionController(100)
+    controller.acquire(90)
+    order = []
+
+    def worker(name, nbytes):
+        controller.acquire(nbytes, timeout=2)
+        order.append(name)
+
+    big = _start(worker, "big", 100)
+    _wait_until(lambda: controller.stats()["waiting"] == 1)
+    # 작은 작업은 지금 자리가 있어도 앞의 큰 작업을 앞지르지 못한다
+    small = _start(worker, "small", 5)
+    _wait_until(lambda: controller.stats()["waiting"] == 2)
+    assert order == []
+
+    controller.release(90)
+    big.join(1)
+    assert order == ["big"]
+
+    controller.release(100)
+    small.join(1)
+    assert order == ["big", "small"]
+
+
+def test_timed_out_head_unblocks_next_waiter():
+    controller = AdmissionController(100)
+    controller.acquire(50)
+    admitted = threading.Event()
+
+    def head():
+        with pytest.raises(AdmissionTimeout):
+            controller.acquire(100, timeout=0.1)
+
+    def tail():
+        controller.acquire(10, timeout=2)
+        admitted.set()
+
+    head_thread = _start(head)
+    _wait_until(lambda: controller.stats()["waiting"] == 1)
+    _start(tail)
+    head_thread.join(1)
+    assert admitted.wait(1)
+    assert controller.stats()["reserved_bytes"] == 60
+
+
+def test_async_waiter_is_woken_by_release_from_thread():
+    controller = AdmissionController(100)
+    controller.acquire(100)
+
+    async def main():
+        threading.Timer(0.05, controller.release, args=(100,)).start()
+        async with controller.reserve_async(40, timeout=2):
+            assert controller.stats()["reserved_bytes"] == 40
+        assert controller.stats()["reserved_bytes"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_async_waiter_leaves_queue():
+    controller = AdmissionController(100)
+    controller.acquire(100)
+
+    async def main():
+        task = asyncio.create_task(controller.acquire_async(10, timeout=5))
+        await asyncio.sleep(0.02)
+        assert controller.stats()["waiting"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert controller.stats()["waiting"] == 0
+    controller.release(100)
+    assert controller.stats()["reserved_bytes"] == 0
+
+
+def test_shrunk_reservation_admits_waiter_while_streaming():
+    controller = AdmissionController(100)
+    processed = threading.Event()
+    streaming_done = threading.Event()
+
+    def streaming_request():
+        with controller.reserve(90) as reservation:
+            reservation.shrink(10)  # 이미지 처리 끝, payload만 유지
+            processed.set()
+            streaming_done.wait(2)
+
+    stream = _start(streaming_request)
+    assert processed.wait(1)
+    # 스트리밍이 끝나기 전에 다음 요청의 디코딩 예약이 들어간다
+    with controller.reserve(80, timeout=0.5):
+        assert controller.stats()["active"] == 2
+        assert controller.stats()["reserved_bytes"] == 90
+    streaming_done.set()
+    stream.join(1)
+    assert controller.stats()["reserved_bytes"] == 0
+    assert controller.stats()["active"] == 0
+
+
+def test_shrink_wakes_queued_waiter():
+    controller = AdmissionController(100)
+    admitted = threading.Event()
+
+    def waiter():
+        controller.acquire(50, timeout=2)
+        admitted.set()
+
+    with controller.reserve(90) as reservation:
+        _start(waiter)
+        _wait_until(lambda: controller.stats()["waiting"] == 1)
+        reservation.shrink(40)
+        assert admitted.wait(1)
+    controller.release(50)
+    assert controller.stats()["reserved_bytes"] == 0
+
+
+def _png(width, height, mode="RGB"):
+    buf = io.BytesIO()
+    Image.new(mode, (width, height)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_estimate_untiled_rgb_image_is_decoded_size():
+    data = _png(1400, 6000)
+    # 리사이즈/타일/RGB 변환이 없으므로 디코딩된 원본만
+    assert estimate_image_bytes(data) == 1400 * 6000 * 3
+    assert estimate_payload_bytes(data) == MAX_TILE_BYTES * 4 // 3
+    assert estimate_request_bytes([(data, "image/png")]) == (
+        1400 * 6000 * 3 + MAX_TILE_BYTES * 4 // 3,
+        MAX_TILE_BYTES * 4 // 3,
+    )
+
+
+def test_estimate_tall_image_counts_tiles():
+    data = _png(1400, 8000)
+    tiles = 3  # 0-4000, 3700-7700, 7400-8000
+    assert estimate_payload_bytes(data) == tiles * MAX_TILE_BYTES * 4 // 3
+    assert estimate_image_bytes(data) == 1400 * 8000 * 3 + 1400 * 4000 * 3
+
+
+def test_estimate_rgba_counts_jpeg_conversion():
+    data = _png(1000, 2000, "RGBA")
+    assert estimate_image_bytes(data) == 1000 * 2000 * (4 + 3)
@@ -0,0 +1,134 @@
+import csv
+import io
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import columnar_export
+import server
+from columnar_export import COLUMNS, _ChunkSink, flatten_row, iter_csv
+
+ROW = {
+    "id": 1,
+    "created_at": datetime(2026, 1, 2, 3, 4, 5),
+    "image_count": 2,
+    "product_name": "상품",
+    "brand_name": "브랜드",
+    "category": "식품",
+    "overall_score": 71,
+    "analysis_stage": "deep",
+    "grade": "B",
+    "scores": {"visual": 80, "copy": "65", "structure": 70.6, "trust": True},
+    "sections": [
+        {"role": "감정공감", "section_score": 80},
+        "not a section",
+        {"role": None, "section_score": "bad"},
+    ],
+}
+
+
+def test_flatten_row_coerces_types():
+    flat = flatten_row(ROW)
+    assert list(flat) == [name for name, _type in COLUMNS]
+    assert flat["score_visual"] == 80
+    assert flat["score_copy"] == 65  # 숫자 문자열
+    assert flat["score_structure"] == 71  # 반올림
+    assert flat["score_trust"] is None  # bool은 점수가 아님
+    assert flat["score_mobile"] is None  # 없는 키
+    assert flat["section_count"] == 2  # dict가 아닌 항목 제외
+    assert flat["section_roles"] == ["감정공감", None]
+    assert flat["section_scores"] == [80, None]
+
+
+def test_flatten_row_tolerates_missing_analysis():
+    flat = flatten_row({
+        "id": 2, "scores": "oops", "sections": None, "grade": 3, "analysis_stage": None,
+    })
+    assert flat["grade"] is None
+    assert flat["section_count"] == 0
+    assert flat["section_roles"] == []
+    assert all(flat[f"score_{k}"] is None for k in columnar_export.SCORE_KEYS)
+
+
+def test_chunk_sink_keeps_position_across_drains():
+    sink = _ChunkSink()
+    sink.write(b"abc")
+    sink.write(memoryview(b"de"))
+    assert sink.tell() == 5
+    assert sink.drain() == b"abcde"
+    assert sink.drain() == b""
+    sink.write(b"f")
+    assert sink.tell() == 6
+    assert sink.drain() == b"f"
+
+
+def test_parquet_streams_one_row_group_per_batch():
+    pq = pytest.importorskip("pyarrow.parquet")
+    consumed = []
+
+    def batches():
+        for start in (1, 4):
+            consumed.append(start)
+            yield [{**ROW, "id": i} for i in range(start, start + 3)]
+
+    stream = columnar_export.iter_parquet(batches())
+    first = next(stream)
+    # 첫 배치의 row group은 두 번째 배치를 읽기 전에 흘려보낸다
+    assert consumed == [1]
+    assert first
+    data = first + b"".join(stream)
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.column("id").to_pylist() == [1, 2, 3, 4, 5, 6]
+    assert table.column("section_roles").to_pylist()[0] == ["감정공감", None]
+    assert table.schema == columnar_export._arrow_schema()
+
+
+def test_arrow_stream_round_trips():
+    pa = pytest.importorskip("pyarrow")
+    data = b"".join(columnar_export.iter_arrow([[ROW], [{**ROW, "id": 2}]]))
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.column("id").to_pylist() == [1, 2]
+    assert table.column("score_copy").to_pylist() == [65, 65]
+
+
+def test_csv_joins_list_columns():
+    text = "".join(iter_csv([[ROW]]))
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert rows[0]["section_roles"] == "감정공감|"
+    assert rows[0]["section_scores"] == "80|"
+    assert rows[0]["created_at"] == "2026-01-02T03:04:05"
+
+
+def test_postgres_export_casts_analysis_result_once():
+    sql = str(
+        server._columnar_export_stmt("postgresql").compile(dialect=postgresql.dialect())
+    )
+    assert sql.count("CAST(") == 1
+    assert "JSONB" in sql
+    assert "OFFSET" in sql
+
+
+def test_export_endpoint_streams_parquet(monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setenv("ADMIN_PASSWORD", "pw")
+    with server.app.app_context():
+        sub_id = server.save_submission(
+            {"grade": "A", "scores": {"visual": 90}, "sections": [{"role": "CTA"}]}, 1
+        ).id
+    client = server.app.test_client()
+
+    resp = client.get("/admin/export-columnar?format=parquet", auth=("admin", "pw"))
+    assert resp.status_code == 200
+    table = pq.read_table(io.BytesIO(resp.data))
+    row = table.to_pylist()[table.column("id").to_pylist().index(sub_id)]
+    assert row["grade"] == "A"
+    assert row["score_visual"] == 90
+    assert row["section_roles"] == ["CTA"]
+
+    assert client.get(
+        "/admin/export-columnar?format=xlsx", auth=("admin", "pw")
+    ).status_code == 400
@@ -0,0 +1,135 @@
+import io
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+import analyzer
+import image_store
+import server
+from image_store import ByteLRU
+
+QUICK = '```json\n{"scores": {"hook": 70}}\n```'
+DEEP = '```json\n{"sections": [{"order": 1}]}\n```'
+
+
+class FakeModel:
+    """analyzer._call_api_with_retry 대체. 심층 분석 호출을 막거나 실패시킬 수 있다."""
+
+    def __init__(self):
+        self.deep_gate = threading.Event()
+        self.deep_gate.set()
+        self.deep_started = threading.Event()
+        self.fail_deep = False
+
+    def __call__(self, client, content, system=None, max_tokens=None):
+        text = content[-1]["text"]
+        if "빠른 스캔 결과" not in text and "빠른 스캔 + 섹션" not in text:
+            return QUICK
+        self.deep_started.set()
+        assert self.deep_gate.wait(5)
+        if self.fail_deep:
+            raise RuntimeError("model down")
+        return DEEP
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setattr(analyzer, "_call_api_with_retry", fake)
+    monkeypatch.setattr(image_store, "_images", ByteLRU(16 * 1024 * 1024))
+    monkeypatch.setattr(image_store, "_tiles", ByteLRU(16 * 1024 * 1024))
+    return fake
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def _quick(client, **form):
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 300), "red").save(buf, format="PNG")
+    resp = client.post(
+        "/analyze/quick", data={"images": (io.BytesIO(buf.getvalue()), "a.png"), **form}
+    )
+    assert resp.status_code == 200
+    assert resp.json["analysis_stage"] == "quick"
+    return resp.json["submission_id"]
+
+
+def test_deep_fills_submission_and_repeat_returns_stored_result(model, client):
+    sub_id = _quick(client)
+
+    resp = client.post(f"/analyze/deep/{sub_id}")
+    assert resp.status_code == 200
+    assert resp.json["analysis_stage"] == "deep"
+    assert resp.json["sections"] == [{"order": 1}]
+    assert resp.json["scores"] == {"hook": 70}  # 빠른 스캔 점수 유지
+
+    again = client.post(f"/analyze/deep/{sub_id}")
+    assert again.status_code == 200
+    assert again.json == resp.json
+
+
+def test_deep_returns_409_while_running(model, client):
+    sub_id = _quick(client)
+    model.deep_gate.clear()
+    statuses = []
+    first = threading.Thread(
+        target=lambda: statuses.append(client.post(f"/analyze/deep/{sub_id}").status_code)
+    )
+    first.start()
+    assert model.deep_started.wait(5)
+
+    assert client.post(f"/analyze/deep/{sub_id}").status_code == 409
+
+    model.deep_gate.set()
+    first.join(5)
+    assert statuses == [200]
+
+
+def test_failed_deep_is_requeued_for_retry(model, client):
+    sub_id = _quick(client)
+    model.fail_deep = True
+    assert client.post(f"/analyze/deep/{sub_id}").status_code == 500
+    assert sub_id in server._pending_deep
+
+    model.fail_deep = False
+    resp = client.post(f"/analyze/deep/{sub_id}")
+    assert resp.status_code == 200
+    assert resp.json["analysis_stage"] == "deep"
+
+
+def test_deep_returns_410_after_images_expire(model, client, monkeypatch):
+    sub_id = _quick(client)
+    monkeypatch.setattr(image_store, "_images", ByteLRU(16 * 1024 * 1024))
+    assert client.post(f"/analyze/deep/{sub_id}").status_code == 410
+    # 만료된 항목은 되돌리지 않는다
+    assert client.post(f"/analyze/deep/{sub_id}").status_code == 410
+
+
+def test_deep_returns_410_after_pending_ttl(model, client, monkeypatch):
+    sub_id = _quick(client)
+    monkeypatch.setattr(server, "DEEP_TTL", -1)
+    server._cleanup_pending_deep()
+    assert client.post(f"/analyze/deep/{sub_id}").status_code == 410
+
+
+def test_background_deep_runs_on_pool(model, client):
+    model.deep_gate.clear()
+    sub_id = _quick(client, deep="background")
+    assert model.deep_started.wait(5)
+    assert client.post(f"/analyze/deep/{sub_id}").status_code == 409
+    model.deep_gate.set()
+
+    # 백그라운드 작업이 끝나면 저장된 심층 결과를 돌려준다
+    for _ in range(100):
+        resp = client.post(f"/analyze/deep/{sub_id}")
+        if resp.status_code != 409:
+            break
+        time.sleep(0.05)
+    assert resp.status_code == 200
+    assert resp.json["analysis_stage"] == "deep"
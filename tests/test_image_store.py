@@ -0,0 +1,47 @@
+import pytest
+
+import image_store
+from image_store import ByteLRU
+
+
+def test_evicts_least_recently_used_first():
+    cache = ByteLRU(10)
+    assert cache.put("a", "A", 4)
+    assert cache.put("b", "B", 4)
+    assert cache.get("a") == "A"  # a가 최근 사용으로 바뀜
+    assert cache.put("c", "C", 4)
+    assert "b" not in cache
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.size == 8
+
+
+def test_replacing_key_updates_size():
+    cache = ByteLRU(10)
+    cache.put("a", "A", 6)
+    cache.put("a", "A2", 3)
+    assert cache.get("a") == "A2"
+    assert cache.stats() == {"items": 1, "bytes": 3, "max_bytes": 10}
+
+
+def test_oversize_item_is_rejected_not_stored():
+    cache = ByteLRU(10)
+    cache.put("a", "A", 4)
+    assert cache.put("big", "X", 11) is False
+    assert "big" not in cache
+    assert cache.get("a") == "A"
+
+
+def test_put_image_deduplicates_by_content(monkeypatch):
+    monkeypatch.setattr(image_store, "_images", ByteLRU(100))
+    first = image_store.put_image(b"same", "image/png")
+    second = image_store.put_image(b"same", "image/png")
+    assert first == second
+    assert image_store.get_image(first) == (b"same", "image/png")
+    assert image_store.stats()["images"]["items"] == 1
+
+
+def test_put_image_raises_when_larger_than_store(monkeypatch):
+    monkeypatch.setattr(image_store, "_images", ByteLRU(3))
+    with pytest.raises(image_store.ImageTooLarge):
+        image_store.put_image(b"toolarge", "image/png")
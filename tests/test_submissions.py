@@ -0,0 +1,120 @@
+import json
+
+import pytest
+import sqlalchemy as sa
+
+import server
+from models import Submission, db
+
+AUTH = ("admin", "pw")
+
+RESULT = {
+    "meta": {"product_name": "상품A"},
+    "scores": {"hook": 80, "trust": 60},
+    "sections": [{"order": 1, "section_name": "HERO"}],
+    "analysis_stage": "quick",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("ADMIN_PASSWORD", "pw")
+    return server.app.test_client()
+
+
+@pytest.fixture
+def sub_id():
+    with server.app.app_context():
+        return server.save_submission(dict(RESULT), image_count=2).id
+
+
+def _get(client, url):
+    return client.get(url, auth=AUTH)
+
+
+def _write_from_other_worker(sub_id, result):
+    """다른 워커 프로세스의 쓰기: 이 프로세스의 캐시 무효화 없이 DB만 갱신."""
+    with server.app.app_context():
+        db.session.execute(
+            sa.update(Submission)
+            .where(Submission.id == sub_id)
+            .values(
+                analysis_result=json.dumps(result, ensure_ascii=False),
+                revision=Submission.revision + 1,
+            )
+        )
+        db.session.commit()
+
+
+def test_fields_projects_columns_and_analysis_fields(client, sub_id):
+    resp = _get(client, f"/api/submissions/{sub_id}?fields=image_count,scores,analysis_stage")
+    assert resp.status_code == 200
+    assert resp.json == {
+        "id": sub_id,
+        "image_count": 2,
+        "scores": {"hook": 80, "trust": 60},
+        "analysis_stage": "quick",
+    }
+
+
+def test_fields_accepts_id(client, sub_id):
+    resp = _get(client, f"/api/submissions/{sub_id}?fields=id")
+    assert resp.status_code == 200
+    assert resp.json == {"id": sub_id}
+
+
+def test_fields_rejects_unknown_and_missing_row(client, sub_id):
+    resp = _get(client, f"/api/submissions/{sub_id}?fields=scores,nope")
+    assert resp.status_code == 400
+    assert "nope" in resp.json["error"]
+    assert _get(client, "/api/submissions/999999?fields=scores").status_code == 404
+
+
+def test_without_fields_returns_full_submission(client, sub_id):
+    resp = _get(client, f"/api/submissions/{sub_id}")
+    assert resp.status_code == 200
+    assert resp.json["analysis_result"]["sections"] == RESULT["sections"]
+
+
+def test_update_bumps_revision(sub_id):
+    with server.app.app_context():
+        submission = db.session.get(Submission, sub_id)
+        assert submission.revision == 1
+        server.update_submission(submission, {**RESULT, "analysis_stage": "deep"})
+        assert db.session.get(Submission, sub_id).revision == 2
+
+
+def test_detail_cache_rerenders_after_write_from_other_worker(client, sub_id):
+    first = _get(client, f"/admin/submission/{sub_id}")
+    assert first.status_code == 200
+    assert "HERO" in first.text
+
+    # 길이/점수/단계가 모두 같은 다시 쓰기도 revision으로 감지한다
+    rewritten = {**RESULT, "sections": [{"order": 1, "section_name": "BANR"}]}
+    assert len(json.dumps(rewritten, ensure_ascii=False)) == len(
+        json.dumps(RESULT, ensure_ascii=False)
+    )
+    _write_from_other_worker(sub_id, rewritten)
+
+    second = _get(client, f"/admin/submission/{sub_id}")
+    assert "BANR" in second.text
+    assert "HERO" not in second.text
+
+
+def test_detail_cache_serves_cached_html_until_revision_changes(client, sub_id, monkeypatch):
+    _get(client, f"/admin/submission/{sub_id}")
+    rendered = []
+    original = server.render_template
+    monkeypatch.setattr(
+        server, "render_template", lambda *a, **k: rendered.append(a) or original(*a, **k)
+    )
+    assert _get(client, f"/admin/submission/{sub_id}").status_code == 200
+    assert rendered == []
+
+    _write_from_other_worker(sub_id, RESULT)
+    _get(client, f"/admin/submission/{sub_id}")
+    assert len(rendered) == 1
+
+
+def test_detail_missing_submission_is_404(client):
+    assert _get(client, "/admin/submission/999999").status_code == 404
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code, tmp_path):
+    env = {
+        **os.environ,
+        "WARMUP": "1",
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'warmup.db'}",
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=60, check=True,
+    )
+    return out.stdout.split()
+
+
+def test_gunicorn_path_starts_warmup_on_import(tmp_path):
+    assert _run("import server; print(server._warmup_started)", tmp_path) == ["True"]
+
+
+def test_asgi_path_defers_warmup_to_lifespan(tmp_path):
+    code = (
+        "import asgi\n"
+        "from starlette.testclient import TestClient\n"
+        "print(asgi.server._warmup_started)\n"
+        "with TestClient(asgi.app):\n"
+        "    print(asgi.server._warmup_started)\n"
+    )
+    assert _run(code, tmp_path) == ["False", "True"]